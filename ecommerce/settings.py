@@ -47,6 +47,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'shop.middleware.CartMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -63,6 +64,10 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'shop.context_processors.cart',
+                'shop.context_processors.cart_badge',
+                'shop.context_processors.catalog',
+                'shop.context_processors.categories',
             ],
         },
     },
@@ -82,6 +87,20 @@ DATABASES = {
 }
 
 
+# Cache
+# Local memory by default (one cache per process: catalog version bumps
+# are not seen by other workers). With several workers, share the cache:
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#   CACHE_LOCATION=redis://127.0.0.1:6379/1
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'ecommerce'),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -129,3 +148,15 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Cart storage backend:
+# - shop.services.cart_storage.SessionCartStorage (cart inside the session)
+# - shop.services.cart_storage.DatabaseCartStorage (Cart/CartLine tables)
+# - shop.services.cart_storage.CacheCartStorage (Django cache framework)
+CART_STORAGE_BACKEND = 'shop.services.cart_storage.SessionCartStorage'
+
+# Product list pagination:
+# - offset: numbered pages (COUNT + OFFSET)
+# - estimated: numbered pages, count taken from the cached facet total
+# - keyset: previous/next cursor links on (created_at, id), no COUNT or OFFSET
+PRODUCT_LIST_PAGINATION = 'keyset'
@@ -5,14 +5,17 @@ Imports all admin classes for automatic registration.
 """
 
 from .category_admin import CategoryAdmin
-from .product_admin import ProductAdmin
+from .product_admin import ProductAdmin, ProductStockForm, StockMovementInline
 from .customer_admin import CustomerAdmin
-from .order_admin import OrderAdmin, OrderItemInline
+from .order_admin import OrderAdmin, OrderItemInline, OrderStatusHistoryInline
 
 __all__ = [
     'CategoryAdmin',
     'ProductAdmin',
+    'ProductStockForm',
+    'StockMovementInline',
     'CustomerAdmin',
     'OrderAdmin',
     'OrderItemInline',
+    'OrderStatusHistoryInline',
 ]
@@ -1,5 +1,13 @@
-from django.contrib import admin
-from ..models import Order, OrderItem
+from django.contrib import admin, messages
+from django.http import StreamingHttpResponse
+from ..constants import (
+    ORDER_STATUS_CONFIRMED,
+    ORDER_STATUS_SHIPPED,
+    ORDER_STATUS_DELIVERED,
+    ORDER_STATUS_CANCELLED,
+)
+from ..models import Order, OrderItem, OrderStatusHistory
+from ..services.order_export_service import EXPORT_FORMAT_CSV, OrderExporter
 from django.utils.translation import gettext_lazy as _
 
 class OrderItemInline(admin.TabularInline):
@@ -13,6 +21,46 @@ class OrderItemInline(admin.TabularInline):
     get_final_price.short_description = 'Total'
 
 
+class OrderStatusHistoryInline(admin.TabularInline):
+    """Read-only status transition log."""
+    model = OrderStatusHistory
+    extra = 0
+    can_delete = False
+    fields = ['from_status', 'to_status', 'changed_by', 'created_at']
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+def _transition_action(status, description):
+    """Build an admin action moving the selected orders to ``status``."""
+
+    def action(modeladmin, request, queryset):
+        selected = queryset.count()
+        moved = Order.transition_orders(queryset.values('pk'), status, changed_by=request.user)
+        modeladmin.message_user(request, f"{moved} order(s) marked as {status}.", messages.SUCCESS)
+        if moved < selected:
+            modeladmin.message_user(
+                request,
+                f"{selected - moved} order(s) skipped: not allowed to become {status}.",
+                messages.WARNING
+            )
+
+    action.__name__ = f"mark_{status}"
+    action.short_description = description
+    return action
+
+
+@admin.action(description=_("Export selected orders with lines (CSV)"))
+def export_orders_csv(modeladmin, request, queryset):
+    """Stream the selected orders as CSV, one row per order line."""
+    exporter = OrderExporter(queryset, EXPORT_FORMAT_CSV)
+    response = StreamingHttpResponse(exporter, content_type=exporter.content_type)
+    response['Content-Disposition'] = f'attachment; filename="{exporter.filename}"'
+    return response
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     """Admin interface for Order model."""
@@ -20,34 +68,59 @@ class OrderAdmin(admin.ModelAdmin):
     list_display = [
         'order_number', 
         'user', 
+        'get_item_count',
         'get_total_price', 
         'status', 
         'created_at'
     ]
+    list_select_related = ['user']
     list_filter = ['status', 'created_at']
     search_fields = ['order_number', 'user__email']
-    readonly_fields = ['order_number', 'created_at', 'updated_at']
-    inlines = [OrderItemInline]
+    # Status changes only through the transition actions
+    readonly_fields = ['order_number', 'status', 'subtotal', 'total', 'created_at', 'updated_at']
+    inlines = [OrderItemInline, OrderStatusHistoryInline]
+    actions = [
+        _transition_action(ORDER_STATUS_CONFIRMED, _("Mark selected orders as confirmed")),
+        _transition_action(ORDER_STATUS_SHIPPED, _("Mark selected orders as shipped")),
+        _transition_action(ORDER_STATUS_DELIVERED, _("Mark selected orders as delivered")),
+        _transition_action(ORDER_STATUS_CANCELLED, _("Cancel selected orders (restores stock)")),
+        export_orders_csv,
+    ]
     
     fieldsets = (
         (_('Order Info'), {
             'fields': ('order_number', 'user', 'status')
         }),
+        (_('Totals'), {
+            'fields': ('subtotal', 'tax_amount', 'shipping_cost', 'total')
+        }),
         (_('Timestamps'), {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
     
+    def get_queryset(self, request):
+        """Annotate unit counts in the changelist query."""
+        return super().get_queryset(request).with_item_count()
+
+    def get_item_count(self, obj):
+        """Units in the order (SQL annotation)."""
+        return obj.item_count
+    get_item_count.short_description = 'Items'
+    get_item_count.admin_order_field = 'item_count'
+    
     def get_total_price(self, obj):
-        """Total price display."""
+        """Total price display (stored column, sortable)."""
         return f"€{obj.get_total_price():.2f}"
     get_total_price.short_description = 'Total'
+    get_total_price.admin_order_field = 'total'
 
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = ['order', 'product', 'quantity', 'unit_price', 'get_final_price']
+    list_select_related = ['order', 'product']
     list_filter = ['order__status', 'created_at']
     search_fields = ['order__order_number', 'product__name']
     
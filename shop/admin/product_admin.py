@@ -1,12 +1,61 @@
-from django.contrib import admin
-from ..models import Product
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
+from ..models import Product, StockMovement
+from ..services.inventory_service import inventory_ledger
+from ..services.reservation_service import InsufficientStockError
 from django.utils.translation import gettext_lazy as _
 
 
+class ProductStockForm(forms.ModelForm):
+    """
+    Product form that remembers the stock shown to the admin.
+
+    The rendered stock travels back in a hidden ``initial-stock`` input,
+    so a stock edit is the difference with what the admin saw, not with
+    the stock re-read when the form is submitted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'stock' in self.fields:
+            self.fields['stock'].show_hidden_initial = True
+
+    def stock_delta(self) -> int:
+        """Submitted stock minus the rendered stock (0 if not edited)."""
+        if 'stock' not in self.changed_data:
+            return 0
+        field = self.fields['stock']
+        rendered = field.hidden_widget().value_from_datadict(
+            self.data, self.files, self.add_initial_prefix('stock')
+        )
+        try:
+            rendered = field.to_python(rendered)
+        except ValidationError:
+            rendered = None
+        if rendered is None:
+            rendered = self.initial.get('stock', 0)
+        return self.cleaned_data['stock'] - rendered
+
+
+class StockMovementInline(admin.TabularInline):
+    """Read-only stock ledger of the product (movements not compacted yet)."""
+    model = StockMovement
+    extra = 0
+    can_delete = False
+    fields = ['kind', 'quantity', 'order', 'note', 'created_at']
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     """Admin interface for Product model."""
     
+    form = ProductStockForm
+    inlines = [StockMovementInline]
     list_display = ['name', 'get_category_name', 'price', 'stock', 'is_available']
     list_filter = ['category', 'is_available']
     search_fields = ['name', 'description']
@@ -20,6 +69,39 @@ class ProductAdmin(admin.ModelAdmin):
         return obj.category.name if obj.category else '_'
     get_category_name.short_description = 'Category'
 
+    def get_changelist_form(self, request, **kwargs):
+        """The list_editable rows also carry their rendered stock."""
+        kwargs.setdefault('form', ProductStockForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def save_model(self, request, obj, form, change):
+        """
+        Save stock edits as ledger adjustments.
+
+        The other fields are saved without ``stock``. A stock edit becomes
+        the delta between the submitted and the rendered value, applied
+        with ``stock = stock + d``, so sales made while the form was open
+        are kept. A decrease larger than the current stock is refused.
+        """
+        if not change:
+            return super().save_model(request, obj, form, change)
+
+        obj.save(update_fields=[
+            field.name for field in obj._meta.concrete_fields
+            if not field.primary_key and field.name != 'stock'
+        ])
+        delta = form.stock_delta() if isinstance(form, ProductStockForm) else 0
+        if delta:
+            try:
+                inventory_ledger.adjust(obj.pk, delta, note=f"Admin: {request.user}")
+            except InsufficientStockError:
+                self.message_user(
+                    request,
+                    f"Stock of {obj.name} not changed: only {Product.objects.get(pk=obj.pk).stock} units left.",
+                    messages.ERROR
+                )
+        obj.refresh_from_db(fields=['stock'])
+
     fieldsets = (
         ('Basic Info', {
             'fields': ('name', 'slug', 'category')
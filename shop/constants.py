@@ -33,6 +33,40 @@ ORDER_STATUS_CHOICES = [
     (ORDER_STATUS_CANCELLED, 'Cancelled'),
 ]
 
+# Allowed transitions: status -> statuses it can move to
+ORDER_STATUS_TRANSITIONS = {
+    ORDER_STATUS_PENDING: [ORDER_STATUS_CONFIRMED, ORDER_STATUS_CANCELLED],
+    ORDER_STATUS_CONFIRMED: [ORDER_STATUS_SHIPPED, ORDER_STATUS_CANCELLED],
+    ORDER_STATUS_SHIPPED: [ORDER_STATUS_DELIVERED],
+    ORDER_STATUS_DELIVERED: [],
+    ORDER_STATUS_CANCELLED: [],
+}
+
+# Orders changed per statement by bulk status transitions
+ORDER_TRANSITION_BATCH = 1000
+
+# Lifetime of cached per-user order counts (1 hour)
+USER_ORDER_COUNT_CACHE_TIMEOUT = 60 * 60
+
+# Orders per page in the user order history
+USER_ORDERS_PER_PAGE = 12
+
+# Rows fetched per database round trip by order exports
+ORDER_EXPORT_CHUNK_SIZE = 2000
+
+# =========================================================
+# ORDER NUMBERS
+# =========================================================
+
+# Prefix of generated order numbers (ex: ORD-000042)
+ORDER_NUMBER_PREFIX = 'ORD-'
+
+# Sequence name used for order numbers in the counter table
+ORDER_NUMBER_SEQUENCE = 'order_number'
+
+# Numbers reserved per worker process in one counter UPDATE
+ORDER_NUMBER_BLOCK_SIZE = 50
+
 # =========================================================
 # CATEGORY VALIDATION
 # =========================================================
@@ -58,6 +92,80 @@ MIN_QUANTITY = 1
 # Maximum quantity (cannot order 1000+ products)
 MAX_QUANTITY = 1000
 
+# =========================================================
+# CART STORAGE
+# =========================================================
+
+# Lifetime of carts kept in the cache backend (30 days)
+CART_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+# Maximum operations in one batch cart API request
+MAX_CART_OPERATIONS = 100
+
+# =========================================================
+# STOCK RESERVATIONS
+# =========================================================
+
+# How long checkout holds stock for a cart (15 minutes)
+STOCK_RESERVATION_TTL = 60 * 15
+
+# Expired reservations deleted per statement by the sweeper
+STOCK_RESERVATION_SWEEP_BATCH = 5000
+
+# =========================================================
+# CATALOG FACETS
+# =========================================================
+
+# Price facet ranges: (query value, label, min included, max excluded)
+PRICE_RANGES = [
+    ('0-25', 'Under 25€', None, 25),
+    ('25-100', '25€ - 100€', 25, 100),
+    ('100-500', '100€ - 500€', 100, 500),
+    ('500-', '500€ and more', 500, None),
+]
+
+# Lifetime of cached facet counts (entries also die with the catalog version)
+FACET_CACHE_TIMEOUT = 60 * 60
+
+# =========================================================
+# CATALOG CACHE
+# =========================================================
+
+# Lifetime of whole product list pages cached for anonymous visitors
+CATALOG_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Lifetime of cached template fragments (product cards, sidebars)
+CATALOG_FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+# Lifetime of products in the read-through product cache
+PRODUCT_CACHE_TIMEOUT = 60 * 15
+
+# =========================================================
+# RECOMMENDATIONS
+# =========================================================
+
+# Co-purchased neighbours stored per product
+RECOMMENDATIONS_TOP_K = 10
+
+# Recommendations shown on the product page
+RECOMMENDATIONS_SHOWN = 4
+
+# Orders mined per query by the refresh job
+RECOMMENDATION_ORDER_BATCH = 5000
+
+# Orders with more distinct products are skipped (pairs grow quadratically)
+RECOMMENDATION_MAX_ORDER_PRODUCTS = 50
+
+# Sequence row locked while the recommendations are refreshed
+RECOMMENDATIONS_SEQUENCE = 'recommendations'
+
+# =========================================================
+# CATALOG IMPORT
+# =========================================================
+
+# Products upserted per INSERT ... ON CONFLICT by import_catalog
+CATALOG_IMPORT_BATCH_SIZE = 5000
+
 # =========================================================
 # STOCK VALIDATION
 # =========================================================
@@ -68,11 +176,65 @@ MIN_STOCK = 0
 # Maximum stock (database limit)
 MAX_STOCK = 100000
 
+# Products restocked per UPDATE when cancelling orders in bulk
+STOCK_RESTORE_BATCH = 500
+
+# =========================================================
+# INVENTORY LEDGER
+# =========================================================
+
+# Stock movement kinds (quantity is negative for sales)
+STOCK_MOVEMENT_SALE = 'sale'
+STOCK_MOVEMENT_CANCEL = 'cancel'
+STOCK_MOVEMENT_RESTOCK = 'restock'
+STOCK_MOVEMENT_ADJUSTMENT = 'adjustment'
+
+STOCK_MOVEMENT_CHOICES = [
+    (STOCK_MOVEMENT_SALE, 'Sale'),
+    (STOCK_MOVEMENT_CANCEL, 'Order Cancelled'),
+    (STOCK_MOVEMENT_RESTOCK, 'Restock'),
+    (STOCK_MOVEMENT_ADJUSTMENT, 'Adjustment'),
+]
+
+# Movements older than this are rolled into snapshots by compact_stock_ledger
+STOCK_LEDGER_RETENTION_DAYS = 90
+
+# Products compacted per transaction
+STOCK_COMPACTION_BATCH = 1000
+
 # =========================================================
 # PRODUCT IMAGE UPLOAD PATH
 # =========================================================
 PRODUCT_IMAGE_UPLOAD_PATH = 'products/%Y/%m/'
 
+# Resized copies of product images, named by source content hash
+PRODUCT_IMAGE_DERIVATIVE_PATH = 'products/derivatives/'
+
+# Derivative sizes (bounding box in pixels, aspect ratio kept)
+PRODUCT_IMAGE_SIZES = {
+    'thumbnail': (150, 150),
+    'card': (480, 480),
+    'detail': (1200, 1200),
+}
+
+# Derivative formats (Pillow format name → file extension)
+PRODUCT_IMAGE_FORMATS = {
+    'WEBP': 'webp',
+    'JPEG': 'jpg',
+}
+
+# Encoder quality of the derivatives
+PRODUCT_IMAGE_QUALITY = 82
+
+# Worker processes of the derivative backfill (None: one per CPU)
+PRODUCT_IMAGE_WORKERS = None
+
+# Worker processes building missing derivatives for web requests
+PRODUCT_IMAGE_LAZY_WORKERS = 2
+
+# Seconds before a source that failed to build is queued again
+PRODUCT_IMAGE_RETRY_TIMEOUT = 60 * 10
+
 # =========================================================
 # CUSTOMER VALIDATION
 # =========================================================
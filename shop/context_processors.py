@@ -0,0 +1,57 @@
+"""Template context processors for shop app."""
+from django.utils.functional import SimpleLazyObject
+from .constants import CATALOG_FRAGMENT_CACHE_TIMEOUT
+from .services.cart_badge import get_cart_count
+from .services.cart_service import CartService
+from .services.catalog_cache import get_catalog_version, get_images_version
+from .services.category_registry import category_registry
+
+
+def cart(request):
+    """
+    Expose the request's cart snapshot to templates as ``cart``.
+
+    Evaluated lazily, and shares the snapshot memoized by CartService,
+    so pages that already loaded the cart add no queries.
+    """
+    return {
+        'cart': SimpleLazyObject(lambda: CartService(request).get_snapshot()),
+    }
+
+
+def cart_badge(request):
+    """
+    Expose the cart item count to templates as ``cart_count``.
+
+    Read from the badge cookie, so the navbar renders the count without
+    loading the cart or calling the count endpoint.
+    """
+    return {
+        'cart_count': SimpleLazyObject(lambda: get_cart_count(request)),
+    }
+
+
+def catalog(request):
+    """
+    Expose the catalog version to templates as ``catalog_version``.
+
+    Used in ``{% cache %}`` keys of catalog fragments, with
+    ``catalog_cache_timeout`` as their lifetime. Fragments showing
+    product images also use ``images_version``.
+    """
+    return {
+        'catalog_version': SimpleLazyObject(get_catalog_version),
+        'images_version': SimpleLazyObject(get_images_version),
+        'catalog_cache_timeout': CATALOG_FRAGMENT_CACHE_TIMEOUT,
+    }
+
+
+def categories(request):
+    """
+    Expose the active categories to templates as ``categories``.
+
+    Served from the in-memory category registry: no query.
+    """
+    return {
+        'categories': SimpleLazyObject(category_registry.all),
+    }
@@ -59,6 +59,11 @@ class CheckoutForm(forms.Form):
             'placeholder': 'Country'
         })
     )
+    idempotency_key = forms.CharField(
+        max_length=64,
+        required=False,
+        widget=forms.HiddenInput()
+    )
     notes = forms.CharField(
         max_length=500,
         required=False,
@@ -0,0 +1,42 @@
+"""
+Backfill stored order totals from order lines.
+
+Usage:
+    python manage.py backfill_order_totals --batch-size 5000
+"""
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+from ...models import Order
+
+
+class Command(BaseCommand):
+    """Recompute Order.subtotal / Order.total in primary key ranges."""
+
+    help = "Recompute stored order totals in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Orders updated per statement')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        bounds = Order.objects.aggregate(first=Min('pk'), last=Max('pk'))
+        if bounds['first'] is None:
+            self.stdout.write("No orders.")
+            return
+
+        started = time.perf_counter()
+        updated = 0
+        # Ranges walk the primary key index; each batch commits on its own
+        for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+            ids = Order.objects.filter(pk__gte=start, pk__lt=start + batch_size).values('pk')
+            with transaction.atomic():
+                updated += Order.recalculate_totals(ids)
+            self.stdout.write(f"Updated {updated} orders (up to id {start + batch_size - 1})")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled {updated} orders in {elapsed:.2f}s ({updated / max(elapsed, 1e-9):.0f}/s)"
+        ))
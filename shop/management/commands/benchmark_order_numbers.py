@@ -0,0 +1,82 @@
+"""
+Benchmark order number allocation under concurrency.
+
+Usage:
+    python manage.py benchmark_order_numbers --workers 16 --per-worker 2000
+"""
+import statistics
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from ...constants import ORDER_NUMBER_BLOCK_SIZE
+from ...services.order_number_service import OrderNumberAllocator
+
+
+class Command(BaseCommand):
+    """Allocate order numbers from many workers and check for collisions."""
+
+    help = "Benchmark the order number allocator with concurrent workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Concurrent workers, each with its own allocator')
+        parser.add_argument('--per-worker', type=int, default=1000,
+                            help='Numbers allocated by each worker')
+        parser.add_argument('--block-size', type=int, default=ORDER_NUMBER_BLOCK_SIZE,
+                            help='Values reserved per counter UPDATE')
+        parser.add_argument('--sequence', default='benchmark_order_number',
+                            help='Sequence name (kept apart from real order numbers)')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        per_worker = options['per_worker']
+        results = [None] * workers
+        errors = []
+
+        def run(index):
+            # One allocator per worker simulates one process each
+            allocator = OrderNumberAllocator(options['sequence'], options['block_size'])
+            values, latencies = [], []
+            try:
+                for _ in range(per_worker):
+                    start = time.perf_counter()
+                    values.append(allocator.allocate())
+                    latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+            results[index] = (values, latencies)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if errors:
+            raise CommandError(f"{len(errors)} worker(s) failed: {errors[0]}")
+
+        values = [value for worker_values, _ in results for value in worker_values]
+        latencies = [latency for _, worker_latencies in results for latency in worker_latencies]
+        collisions = len(values) - len(set(values))
+
+        # Compare first and last tenth of calls to show latency stays flat
+        tenth = max(len(latencies) // 10, 1)
+        first = statistics.median(latencies[:tenth]) * 1e6
+        last = statistics.median(latencies[-tenth:]) * 1e6
+        ordered = sorted(latencies)
+        p50 = ordered[len(ordered) // 2] * 1e6
+        p99 = ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)] * 1e6
+
+        self.stdout.write(f"Allocated:   {len(values)} numbers in {elapsed:.2f}s "
+                          f"({len(values) / elapsed:.0f}/s)")
+        self.stdout.write(f"Latency:     p50 {p50:.1f}us, p99 {p99:.1f}us")
+        self.stdout.write(f"Median:      first 10% {first:.1f}us, last 10% {last:.1f}us")
+
+        if collisions:
+            raise CommandError(f"{collisions} duplicate numbers allocated!")
+        self.stdout.write(self.style.SUCCESS("Collisions:  0"))
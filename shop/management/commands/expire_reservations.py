@@ -0,0 +1,34 @@
+"""
+Delete expired stock reservations.
+
+Usage:
+    python manage.py expire_reservations
+    python manage.py expire_reservations --interval 60   # keep sweeping
+"""
+import time
+from django.core.management.base import BaseCommand
+from ...constants import STOCK_RESERVATION_SWEEP_BATCH
+from ...services.reservation_service import stock_reservations
+
+
+class Command(BaseCommand):
+    """Sweep expired holds in bulk, once or periodically."""
+
+    help = "Delete expired stock reservations in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=STOCK_RESERVATION_SWEEP_BATCH,
+                            help='Reservations deleted per statement')
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Seconds between sweeps (0 sweeps once and exits)')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            deleted = stock_reservations.expire(options['batch_size'])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"Expired {deleted} reservation(s) in {elapsed:.2f}s")
+
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
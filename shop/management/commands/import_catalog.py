@@ -0,0 +1,53 @@
+"""
+Import products from a CSV or JSON Lines file.
+
+Columns/keys: name, category, price, and optionally slug, description,
+stock, is_available. Rows are upserted by slug, so re-importing a file
+updates the same products.
+
+Usage:
+    python manage.py import_catalog products.csv
+    python manage.py import_catalog products.jsonl --batch-size 10000
+"""
+from django.core.management.base import BaseCommand, CommandError
+from ...constants import CATALOG_IMPORT_BATCH_SIZE
+from ...services.catalog_import_service import IMPORT_FORMATS, CatalogImporter, read_rows
+
+
+class Command(BaseCommand):
+    """Stream a catalog file into Product rows with batched upserts."""
+
+    help = "Import products from a CSV or JSONL file (upsert by slug)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with header) or JSONL file')
+        parser.add_argument('--format', choices=IMPORT_FORMATS,
+                            help='File format (default: from the extension)')
+        parser.add_argument('--batch-size', type=int, default=CATALOG_IMPORT_BATCH_SIZE,
+                            help='Products upserted per query')
+        parser.add_argument('--no-create-categories', action='store_true',
+                            help='Skip rows whose category does not exist')
+
+    def handle(self, *args, **options):
+        importer = CatalogImporter(
+            batch_size=options['batch_size'],
+            create_categories=not options['no_create_categories']
+        )
+
+        def progress(stats):
+            self.stdout.write(
+                f"{stats.imported} products upserted ({stats.rows_per_second:,.0f} rows/s)"
+            )
+
+        try:
+            stats = importer.run(read_rows(options['path'], options['format']), on_batch=progress)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read {options['path']}: {e}")
+
+        for error in stats.errors:
+            self.stderr.write(f"Skipped {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats.imported} products from {stats.rows} rows "
+            f"({stats.skipped} skipped) in {stats.elapsed:.2f}s "
+            f"({stats.rows_per_second:,.0f} rows/s)"
+        ))
@@ -0,0 +1,26 @@
+"""
+Rebuild the product full-text search index.
+
+Usage:
+    python manage.py rebuild_search_index
+"""
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from ...services.search_service import get_search_backend
+
+
+class Command(BaseCommand):
+    """Recreate the search index from the product table."""
+
+    help = "Rebuild the product full-text search index."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        started = time.perf_counter()
+        with transaction.atomic():
+            backend.rebuild()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt search index ({type(backend).__name__}) in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,35 @@
+"""
+Refresh co-purchase recommendations from new orders.
+
+Usage:
+    python manage.py refresh_recommendations
+    python manage.py refresh_recommendations --full
+"""
+import time
+from django.core.management.base import BaseCommand
+from ...services.recommendation_service import RecommendationService
+from ...constants import RECOMMENDATION_ORDER_BATCH, RECOMMENDATIONS_TOP_K
+
+
+class Command(BaseCommand):
+    """Mine OrderItem co-occurrences into ProductRecommendation rows."""
+
+    help = "Refresh co-purchase recommendations (new orders only, or --full)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Recount every order instead of new ones only')
+        parser.add_argument('--top-k', type=int, default=RECOMMENDATIONS_TOP_K,
+                            help='Recommendations stored per product')
+        parser.add_argument('--batch-size', type=int, default=RECOMMENDATION_ORDER_BATCH,
+                            help='Orders mined per query')
+
+    def handle(self, *args, **options):
+        service = RecommendationService(top_k=options['top_k'], batch_size=options['batch_size'])
+        started = time.perf_counter()
+        stats = service.refresh(full=options['full'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Mined {stats['orders']} orders ({stats['pairs']} product pairs): "
+            f"{stats['products']} products updated in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,35 @@
+"""Middleware for shop app."""
+import logging
+from .services.cart_badge import update_cart_badge
+from .services.cart_storage import (
+    CART_STORAGE_REQUEST_ATTR,
+    CART_DEFER_REQUEST_ATTR,
+    cart_write_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CartMiddleware:
+    """
+    Write cart changes once at the end of the request.
+
+    Must come after SessionMiddleware and AuthenticationMiddleware, so
+    the session is saved after the cart has been flushed into it.
+    Also refreshes the cart badge cookie when the cart was loaded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        setattr(request, CART_DEFER_REQUEST_ATTR, True)
+        response = self.get_response(request)
+
+        storage = getattr(request, CART_STORAGE_REQUEST_ATTR, None)
+        if storage is not None and storage.is_dirty:
+            storage.flush()
+            logger.debug("Cart flushed (%s)", cart_write_stats.as_dict())
+
+        update_cart_badge(request, response)
+        return response
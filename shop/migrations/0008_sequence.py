@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:19
+
+from django.db import migrations, models
+
+
+def seed_order_number_sequence(apps, schema_editor):
+    """Start the order number sequence after the highest existing number."""
+    Order = apps.get_model('shop', 'Order')
+    Sequence = apps.get_model('shop', 'Sequence')
+
+    highest = 0
+    for order_number in Order.objects.values_list('order_number', flat=True).iterator():
+        prefix, _, digits = order_number.partition('-')
+        if prefix == 'ORD' and digits.isdigit():
+            highest = max(highest, int(digits))
+
+    Sequence.objects.update_or_create(
+        name='order_number',
+        defaults={'next_value': highest + 1},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0007_alter_orderitem_quantity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Name')),
+                ('next_value', models.PositiveBigIntegerField(default=1, verbose_name='Next Value')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated')),
+            ],
+            options={
+                'verbose_name': 'Sequence',
+                'verbose_name_plural': 'Sequences',
+            },
+        ),
+        migrations.RunPython(seed_order_number_sequence, migrations.RunPython.noop),
+    ]
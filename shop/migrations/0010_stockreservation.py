@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0009_cart_cartline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('holder', models.CharField(max_length=64, verbose_name='Holder')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Quantity')),
+                ('expires_at', models.DateTimeField(verbose_name='Expires At')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='shop.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Stock Reservation',
+                'verbose_name_plural': 'Stock Reservations',
+                'indexes': [models.Index(fields=['product', 'expires_at'], name='shop_stockr_product_ad0dcd_idx'), models.Index(fields=['expires_at'], name='shop_stockr_expires_ab6cc8_idx')],
+                'constraints': [models.UniqueConstraint(fields=('holder', 'product'), name='unique_holder_product')],
+            },
+        ),
+    ]
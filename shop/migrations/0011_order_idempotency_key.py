@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0010_stockreservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, help_text='Checkout submission token, makes retried submissions return this order', max_length=64, null=True, unique=True, verbose_name='Idempotency Key'),
+        ),
+    ]
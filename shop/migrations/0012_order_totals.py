@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:17
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0011_order_idempotency_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Sum of order lines in EUR (maintained automatically)', max_digits=12, verbose_name='Subtotal'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Subtotal + tax + shipping in EUR (maintained automatically)', max_digits=12, verbose_name='Total'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['total'], name='shop_order_total_cd02c9_idx'),
+        ),
+    ]
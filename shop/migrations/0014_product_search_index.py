@@ -0,0 +1,83 @@
+from django.db import migrations
+
+# DDL frozen at this migration (the live copy is in shop/services/search_service.py)
+SQLITE_FTS_TABLE = 'shop_product_fts'
+SQLITE_CATEGORY_NAME = "(SELECT name FROM shop_category WHERE id = new.category_id)"
+
+SQLITE_CREATE_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        name, description, category,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON shop_product BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, {SQLITE_CATEGORY_NAME});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON shop_product BEGIN
+        DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au
+    AFTER UPDATE OF name, description, category_id ON shop_product BEGIN
+        UPDATE {SQLITE_FTS_TABLE}
+        SET name = new.name, description = new.description, category = {SQLITE_CATEGORY_NAME}
+        WHERE rowid = new.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_category_au
+    AFTER UPDATE OF name ON shop_category BEGIN
+        UPDATE {SQLITE_FTS_TABLE} SET category = new.name
+        WHERE rowid IN (SELECT id FROM shop_product WHERE category_id = new.id);
+    END""",
+    f"""INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description, category)
+    SELECT p.id, p.name, p.description, c.name
+    FROM shop_product p JOIN shop_category c ON c.id = p.category_id""",
+]
+
+SQLITE_DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_category_au",
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ai",
+    f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}",
+]
+
+POSTGRES_CREATE_SQL = [
+    """CREATE INDEX IF NOT EXISTS shop_product_search_idx ON shop_product
+    USING GIN (to_tsvector('simple', name || ' ' || description))""",
+]
+
+POSTGRES_DROP_SQL = [
+    "DROP INDEX IF EXISTS shop_product_search_idx",
+]
+
+
+def _execute(schema_editor, statements):
+    for sql in statements:
+        schema_editor.execute(sql, params=None)
+
+
+def forwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _execute(schema_editor, SQLITE_CREATE_SQL)
+    elif vendor == 'postgresql':
+        _execute(schema_editor, POSTGRES_CREATE_SQL)
+
+
+def backwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _execute(schema_editor, SQLITE_DROP_SQL)
+    elif vendor == 'postgresql':
+        _execute(schema_editor, POSTGRES_DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0013_orderstatushistory'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:41
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def snapshot_current_stock(apps, schema_editor):
+    """Existing stock becomes the opening balance of the ledger."""
+    Product = apps.get_model('shop', 'Product')
+    StockSnapshot = apps.get_model('shop', 'StockSnapshot')
+    now = timezone.now()
+    StockSnapshot.objects.bulk_create(
+        [
+            StockSnapshot(product_id=product_id, quantity=stock, as_of=now, updated_at=now)
+            for product_id, stock in Product.objects.filter(stock__gt=0).values_list('pk', 'stock').iterator()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0015_productrecommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(default=0, verbose_name='Quantity')),
+                ('movements', models.PositiveIntegerField(default=0, verbose_name='Movements')),
+                ('as_of', models.DateTimeField(verbose_name='As Of')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated')),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshot', to='shop.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Stock Snapshot',
+                'verbose_name_plural': 'Stock Snapshots',
+            },
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('sale', 'Sale'), ('cancel', 'Order Cancelled'), ('restock', 'Restock'), ('adjustment', 'Adjustment')], max_length=20, verbose_name='Kind')),
+                ('quantity', models.IntegerField(verbose_name='Quantity')),
+                ('note', models.CharField(blank=True, default='', max_length=255, verbose_name='Note')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created')),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='shop.order', verbose_name='Order')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='shop.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Stock Movement',
+                'verbose_name_plural': 'Stock Movements',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['product', 'created_at'], name='shop_stockm_product_5c5229_idx'), models.Index(fields=['created_at'], name='shop_stockm_created_40264e_idx')],
+            },
+        ),
+        migrations.RunPython(snapshot_current_stock, migrations.RunPython.noop),
+    ]
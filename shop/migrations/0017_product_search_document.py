@@ -0,0 +1,72 @@
+from django.db import migrations
+
+# PostgreSQL only: the search document gains the category name, like the
+# SQLite FTS table. A GIN index cannot cover another table, so a weighted
+# tsvector column is kept up to date by triggers (DDL frozen at this
+# migration, the live copy is in shop/services/search_service.py).
+POSTGRES_CREATE_SQL = [
+    "DROP INDEX IF EXISTS shop_product_search_idx",
+    "ALTER TABLE shop_product ADD COLUMN IF NOT EXISTS search_document tsvector",
+    """CREATE OR REPLACE FUNCTION shop_product_search_document() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_document :=
+            setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(
+                (SELECT name FROM shop_category WHERE id = NEW.category_id), '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS shop_product_search_document ON shop_product",
+    """CREATE TRIGGER shop_product_search_document
+    BEFORE INSERT OR UPDATE OF name, description, category_id ON shop_product
+    FOR EACH ROW EXECUTE FUNCTION shop_product_search_document()""",
+    """CREATE OR REPLACE FUNCTION shop_category_search_document() RETURNS trigger AS $$
+    BEGIN
+        UPDATE shop_product SET category_id = category_id WHERE category_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS shop_category_search_document ON shop_category",
+    """CREATE TRIGGER shop_category_search_document
+    AFTER UPDATE OF name ON shop_category
+    FOR EACH ROW EXECUTE FUNCTION shop_category_search_document()""",
+    "UPDATE shop_product SET category_id = category_id",
+    "CREATE INDEX IF NOT EXISTS shop_product_search_document_idx ON shop_product USING GIN (search_document)",
+]
+
+POSTGRES_DROP_SQL = [
+    "DROP INDEX IF EXISTS shop_product_search_document_idx",
+    "DROP TRIGGER IF EXISTS shop_category_search_document ON shop_category",
+    "DROP FUNCTION IF EXISTS shop_category_search_document()",
+    "DROP TRIGGER IF EXISTS shop_product_search_document ON shop_product",
+    "DROP FUNCTION IF EXISTS shop_product_search_document()",
+    "ALTER TABLE shop_product DROP COLUMN IF EXISTS search_document",
+    """CREATE INDEX IF NOT EXISTS shop_product_search_idx ON shop_product
+    USING GIN (to_tsvector('simple', name || ' ' || description))""",
+]
+
+
+def _execute(schema_editor, statements):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in statements:
+            schema_editor.execute(sql, params=None)
+
+
+def forwards(apps, schema_editor):
+    _execute(schema_editor, POSTGRES_CREATE_SQL)
+
+
+def backwards(apps, schema_editor):
+    _execute(schema_editor, POSTGRES_DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0016_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_mined_orders(apps, schema_editor):
+    """Orders below the former high-water mark were already mined."""
+    Order = apps.get_model('shop', 'Order')
+    Sequence = apps.get_model('shop', 'Sequence')
+    sequence = Sequence.objects.filter(name='recommendations').first()
+    if sequence is not None:
+        Order.objects.filter(pk__lt=sequence.next_value).update(recommendations_mined=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0017_product_search_document'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='recommendations_mined',
+            field=models.BooleanField(default=False, editable=False, help_text='Counted by the recommendation job (set by refresh_recommendations)', verbose_name='Recommendations Mined'),
+        ),
+        migrations.RunPython(mark_mined_orders, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('recommendations_mined', False)), fields=['id'], name='shop_order_unmined_idx'),
+        ),
+    ]
@@ -9,6 +9,13 @@ from .product import Product
 from .customer import Customer
 from .order import Order
 from .order_item import OrderItem
+from .order_status_history import OrderStatusHistory
+from .sequence import Sequence
+from .cart import Cart, CartLine
+from .reservation import StockReservation
+from .recommendation import ProductRecommendation
+from .stock_movement import StockMovement
+from .stock_snapshot import StockSnapshot
 
 __all__ = [
     'Category',
@@ -16,4 +23,12 @@ __all__ = [
     'Customer',
     'Order',
     'OrderItem',
+    'OrderStatusHistory',
+    'Sequence',
+    'Cart',
+    'CartLine',
+    'StockReservation',
+    'ProductRecommendation',
+    'StockMovement',
+    'StockSnapshot',
 ]
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+Cart Models: Persistent shopping carts for the database cart storage.
+"""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from django.core.validators import MinValueValidator, MaxValueValidator
+from ..constants import MIN_QUANTITY, MAX_QUANTITY
+
+
+class Cart(models.Model):
+    """
+    Shopping cart owned by a user or by an anonymous session token.
+
+    Attributes:
+        user (ForeignKey): Owner when authenticated
+        token (str): Owner token stored in the session when anonymous
+        created_at (datetime): Creation timestamp
+        updated_at (datetime): Last modification timestamp
+    """
+
+    user = models.OneToOneField(
+        'auth.User',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='cart',
+        verbose_name=_("User")
+    )
+
+    token = models.CharField(
+        max_length=32,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name=_("Anonymous Token")
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Created")
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Updated")
+    )
+
+    class Meta:
+        verbose_name = _("Cart")
+        verbose_name_plural = _("Carts")
+
+    def __str__(self):
+        return f"Cart #{self.pk}"
+
+
+class CartLine(models.Model):
+    """
+    Single product line within a Cart.
+
+    Unique per (cart, product) so lines can be upserted in one statement.
+    """
+
+    cart = models.ForeignKey(
+        'Cart',
+        on_delete=models.CASCADE,
+        related_name='lines',
+        verbose_name=_("Cart")
+    )
+
+    product = models.ForeignKey(
+        'Product',
+        on_delete=models.CASCADE,
+        verbose_name=_("Product")
+    )
+
+    quantity = models.PositiveIntegerField(
+        validators=[
+            MinValueValidator(MIN_QUANTITY),
+            MaxValueValidator(MAX_QUANTITY)
+        ],
+        verbose_name=_("Quantity")
+    )
+
+    price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name=_("Price")
+    )
+
+    class Meta:
+        verbose_name = _("Cart Line")
+        verbose_name_plural = _("Cart Lines")
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product'], name='unique_cart_product'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} x{self.quantity}"
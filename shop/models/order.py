@@ -1,11 +1,76 @@
 """
 Order Model: Represents customer orders.
 """
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (
+    Case, DecimalField, F, OuterRef, Prefetch, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import User
 from decimal import Decimal
-from ..constants import ORDER_STATUS_CHOICES
+from django.utils import timezone
+from ..constants import (
+    ORDER_STATUS_CHOICES,
+    ORDER_STATUS_PENDING,
+    ORDER_STATUS_CANCELLED,
+    ORDER_STATUS_TRANSITIONS,
+    ORDER_TRANSITION_BATCH,
+    STOCK_MOVEMENT_CANCEL,
+    STOCK_RESTORE_BATCH,
+)
+
+class OrderQuerySet(models.QuerySet):
+    """
+    Order queries with SQL-side item counts and a single prefetch policy.
+
+    Combine freely: each method adds a fixed number of queries, however
+    many orders are rendered.
+    """
+
+    def with_item_count(self):
+        """Annotate ``item_count``: total units over the lines."""
+        return self.annotate(item_count=Coalesce(
+            Subquery(
+                _order_lines().annotate(units=Sum('quantity')).values('units'),
+                output_field=models.PositiveIntegerField()
+            ),
+            Value(0)
+        ))
+
+    def with_lines(self):
+        """Join customer and user, and prefetch lines with their products."""
+        from .order_item import OrderItem
+
+        return self.select_related('customer', 'user').prefetch_related(
+            Prefetch('items', queryset=OrderItem.objects.select_related('product'))
+        )
+
+
+def _money():
+    return DecimalField(max_digits=12, decimal_places=2)
+
+
+def _order_lines():
+    """Lines of the outer order, grouped by order (for subqueries)."""
+    from .order_item import OrderItem
+
+    return OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order')
+
+
+def _lines_total():
+    """Sum of quantity * unit_price over the lines of the outer order."""
+    return Coalesce(
+        Subquery(
+            _order_lines().annotate(
+                amount=Sum(F('quantity') * F('unit_price'), output_field=_money())
+            ).values('amount'),
+            output_field=_money()
+        ),
+        Value(Decimal('0.00')),
+        output_field=_money()
+    )
+
 
 class Order(models.Model):
     """
@@ -44,12 +109,28 @@ class Order(models.Model):
     status = models.CharField(
         max_length=20,
         choices=ORDER_STATUS_CHOICES,
-        default='pending',
+        default=ORDER_STATUS_PENDING,
         db_index=True,
         verbose_name=_("Status"),
         help_text=_("Current order status")
     )
 
+    subtotal = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name=_("Subtotal"),
+        help_text=_("Sum of order lines in EUR (maintained automatically)")
+    )
+
+    total = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name=_("Total"),
+        help_text=_("Subtotal + tax + shipping in EUR (maintained automatically)")
+    )
+
     tax_amount = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -66,12 +147,29 @@ class Order(models.Model):
         help_text=_("Shipping cost in EUR")
     )
 
+    idempotency_key = models.CharField(
+        max_length=64,
+        unique=True,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Idempotency Key"),
+        help_text=_("Checkout submission token, makes retried submissions return this order")
+    )
+
     notes = models.TextField(
         blank=True,
         verbose_name=_("Notes"),
         help_text=_("Optional order notes or special requests")
     )
 
+    recommendations_mined = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name=_("Recommendations Mined"),
+        help_text=_("Counted by the recommendation job (set by refresh_recommendations)")
+    )
+
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name=_("Created")
@@ -82,6 +180,8 @@ class Order(models.Model):
         verbose_name=_("Updated")
     )
 
+    objects = OrderQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Order")
         verbose_name_plural = _("Orders")
@@ -90,8 +190,23 @@ class Order(models.Model):
             models.Index(fields=['order_number']),
             models.Index(fields=['status']),
             models.Index(fields=['user', '-created_at']),
-            models.Index(fields=['-created_at'])
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['total']),
+            # Orders still to mine: small, however many orders exist
+            models.Index(
+                fields=['id'],
+                condition=Q(recommendations_mined=False),
+                name='shop_order_unmined_idx'
+            ),
         ]
+
+    def save(self, *args, **kwargs):
+        """Keep total consistent with subtotal, tax and shipping."""
+        self.total = self.subtotal + self.tax_amount + self.shipping_cost
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'subtotal', 'tax_amount', 'shipping_cost'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'total'}
+        super().save(*args, **kwargs)
     
     def __str__(self):
         """String representation: order number."""
@@ -103,8 +218,8 @@ class Order(models.Model):
         return reverse('shop:order-detail', kwargs={'order_number': self.order_number})
     
     def get_total(self):
-        """Calculate total order price."""
-        return sum(item.get_final_price() for item in self.items.all())
+        """Stored order total (lines + tax + shipping)."""
+        return self.total
     
     def get_total_price(self):
         """Alias total price."""
@@ -119,21 +234,172 @@ class Order(models.Model):
         from django.utils import timezone
         return (timezone.now() - self.created_at) < timezone.timedelta(days=7)
     
-    def cancel(self):
-        """Cancel this order and restore product stock."""
-        if self.status != 'pending':
+    def update_totals(self):
+        """Recompute stored totals from the order lines."""
+        Order.recalculate_totals([self.pk])
+        self.refresh_from_db(fields=['subtotal', 'total'])
+
+    @classmethod
+    def recalculate_totals(cls, order_ids) -> int:
+        """
+        Recompute stored totals of many orders in one UPDATE.
+
+        Args:
+            order_ids: Ids (or a values_list queryset of ids) of the orders
+
+        Returns:
+            int: Number of orders updated
+        """
+        subtotal = _lines_total()
+
+        return cls.objects.filter(pk__in=order_ids).update(
+            subtotal=subtotal,
+            total=subtotal + F('tax_amount') + F('shipping_cost')
+        )
+
+    def can_transition_to(self, status: str) -> bool:
+        """Check if the order may move to ``status`` from its current status."""
+        return status in ORDER_STATUS_TRANSITIONS[self.status]
+
+    def transition_to(self, status: str, changed_by=None) -> bool:
+        """
+        Move this order to a new status.
+
+        Returns:
+            bool: False if the transition is not allowed (or lost a race)
+        """
+        if not self.can_transition_to(status):
             return False
-        
-        self.status = 'cancelled'
-        self.save(update_fields=['status'])
 
-        # Restore stock
-        for item in self.items.all():
-            item.product.increase_stock(item.quantity)
+        if not Order.transition_orders([self.pk], status, changed_by=changed_by):
+            # Changed concurrently
+            self.refresh_from_db(fields=['status'])
+            return False
 
+        self.status = status
         return True
-    
-@property
-def items(self):
-    """Returns order items with products prefetch."""
-    return self.orderitem_set.select_related('product').all()
+
+    def cancel(self):
+        """Cancel this order and restore product stock."""
+        return self.transition_to(ORDER_STATUS_CANCELLED)
+
+    @classmethod
+    def cancel_orders(cls, order_ids) -> int:
+        """Cancel many orders and restore their stock (see transition_orders)."""
+        return cls.transition_orders(order_ids, ORDER_STATUS_CANCELLED)
+
+    @classmethod
+    def transition_orders(cls, order_ids, status: str, changed_by=None,
+                          from_statuses=None) -> int:
+        """
+        Move many orders to ``status`` with set-based statements.
+
+        Runs in one transaction: the orders allowed to reach ``status``
+        (see ORDER_STATUS_TRANSITIONS) are locked, changed by UPDATEs
+        guarded by ``WHERE status IN (...)`` and logged to
+        OrderStatusHistory with bulk_create. Other orders are skipped,
+        so concurrent calls never apply a transition twice.
+
+        Cancelling also restores stock: one grouped SUM over the order
+        lines and ``stock = stock + CASE ...`` UPDATEs of up to
+        STOCK_RESTORE_BATCH products each, recorded in the stock ledger
+        with one bulk insert.
+
+        Args:
+            order_ids: Ids (or a values_list queryset of ids) of the orders
+            status: Target status
+            changed_by: User making the change, recorded in the history
+            from_statuses: Only move orders currently in these statuses
+
+        Returns:
+            int: Number of orders moved
+        """
+        from .order_status_history import OrderStatusHistory
+
+        sources = [
+            source for source, targets in ORDER_STATUS_TRANSITIONS.items()
+            if status in targets and (from_statuses is None or source in from_statuses)
+        ]
+        now = timezone.now()
+
+        with transaction.atomic():
+            rows = list(
+                cls.objects.select_for_update()
+                .filter(pk__in=order_ids, status__in=sources)
+                .order_by('pk')
+                .values_list('pk', 'status')
+            )
+            if not rows:
+                return 0
+            ids = [pk for pk, _ in rows]
+
+            for start in range(0, len(ids), ORDER_TRANSITION_BATCH):
+                cls.objects.filter(
+                    pk__in=ids[start:start + ORDER_TRANSITION_BATCH],
+                    status__in=sources
+                ).update(status=status, updated_at=now)
+
+            OrderStatusHistory.objects.bulk_create(
+                [
+                    OrderStatusHistory(
+                        order_id=pk,
+                        from_status=from_status,
+                        to_status=status,
+                        changed_by=changed_by,
+                        created_at=now
+                    )
+                    for pk, from_status in rows
+                ],
+                batch_size=ORDER_TRANSITION_BATCH
+            )
+
+            if status == ORDER_STATUS_CANCELLED:
+                cls._restore_stock(ids)
+
+        return len(rows)
+
+    @staticmethod
+    def _restore_stock(order_ids):
+        """Add the quantities of the orders' lines back to product stock (and the ledger)."""
+        from .order_item import OrderItem
+        from .product import Product
+        from .stock_movement import StockMovement
+        from ..services.catalog_cache import bump_catalog_version
+        from ..services.inventory_service import inventory_ledger
+        from ..services.product_cache import product_cache
+
+        restock, movements = {}, []
+        for start in range(0, len(order_ids), ORDER_TRANSITION_BATCH):
+            for order_id, product_id, quantity in (
+                OrderItem.objects.filter(order_id__in=order_ids[start:start + ORDER_TRANSITION_BATCH])
+                .order_by('order_id', 'product_id')
+                .values('order_id', 'product_id')
+                .annotate(quantity=Sum('quantity'))
+                .values_list('order_id', 'product_id', 'quantity')
+            ):
+                restock[product_id] = restock.get(product_id, 0) + quantity
+                movements.append(StockMovement(
+                    product_id=product_id,
+                    kind=STOCK_MOVEMENT_CANCEL,
+                    quantity=quantity,
+                    order_id=order_id
+                ))
+
+        restock = sorted(restock.items())
+        for start in range(0, len(restock), STOCK_RESTORE_BATCH):
+            batch = restock[start:start + STOCK_RESTORE_BATCH]
+            Product.objects.filter(pk__in=[product_id for product_id, _ in batch]).update(
+                stock=F('stock') + Case(
+                    *[When(pk=product_id, then=Value(quantity)) for product_id, quantity in batch],
+                    default=Value(0)
+                )
+            )
+
+        inventory_ledger.record(movements)
+
+        if restock:
+            product_cache.invalidate(product_id for product_id, _ in restock)
+            bump_catalog_version(
+                Product.objects.filter(pk__in=[product_id for product_id, _ in restock])
+                .values_list('category_id', flat=True).distinct()
+            )
@@ -0,0 +1,64 @@
+"""
+OrderStatusHistory Model: Append-only log of order status transitions.
+"""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from ..constants import ORDER_STATUS_CHOICES
+
+
+class OrderStatusHistory(models.Model):
+    """
+    One status transition of an order.
+
+    Rows are only ever inserted (in bulk, by ``Order.transition_orders``).
+
+    Attributes:
+        order (ForeignKey): Order that changed status
+        from_status (str): Status before the transition
+        to_status (str): Status after the transition
+        changed_by (ForeignKey): Staff user who made the change, if any
+        created_at (datetime): Transition timestamp
+    """
+
+    order = models.ForeignKey(
+        'Order',
+        on_delete=models.CASCADE,
+        related_name='status_history',
+        verbose_name=_("Order")
+    )
+
+    from_status = models.CharField(
+        max_length=20,
+        choices=ORDER_STATUS_CHOICES,
+        verbose_name=_("From Status")
+    )
+
+    to_status = models.CharField(
+        max_length=20,
+        choices=ORDER_STATUS_CHOICES,
+        verbose_name=_("To Status")
+    )
+
+    changed_by = models.ForeignKey(
+        'auth.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Changed By")
+    )
+
+    created_at = models.DateTimeField(
+        verbose_name=_("Created")
+    )
+
+    class Meta:
+        verbose_name = _("Order Status Change")
+        verbose_name_plural = _("Order Status History")
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['order', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.order_id}: {self.from_status} -> {self.to_status}"
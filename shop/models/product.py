@@ -5,13 +5,57 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
+from ..services.catalog_cache import bump_catalog_version
 from ..constants import (
     MIN_PRICE, MAX_PRICE,
     MIN_STOCK, MAX_STOCK,
     MAX_QUANTITY,
-    PRODUCT_IMAGE_UPLOAD_PATH
+    PRODUCT_IMAGE_UPLOAD_PATH,
+    STOCK_MOVEMENT_RESTOCK
 )
 
+class ProductQuerySet(models.QuerySet):
+    """
+    Product queries that invalidate catalog caches on bulk writes.
+
+    Bulk writes send no save/delete signals, so they bump the catalog
+    version and drop the written products from the product cache here.
+    Stock-only updates (checkout, restock) are left to their callers,
+    which bump only when availability changes.
+    """
+
+    def update(self, **kwargs):
+        from ..services.product_cache import product_cache
+
+        if set(kwargs) == {'stock'}:
+            return super().update(**kwargs)
+        product_ids = list(self.values_list('pk', flat=True))
+        rows = super().update(**kwargs)
+        if rows:
+            bump_catalog_version()
+            product_cache.invalidate(product_ids)
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from ..services.product_cache import product_cache
+
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            bump_catalog_version({obj.category_id for obj in objs})
+            # Upserts rewrite existing products
+            product_cache.invalidate(obj.pk for obj in objs if obj.pk is not None)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        from ..services.product_cache import product_cache
+
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        if rows and set(fields) != {'stock'}:
+            bump_catalog_version()
+            product_cache.invalidate(obj.pk for obj in objs)
+        return rows
+
+
 class Product(models.Model):
     """
     E-commerce product model.
@@ -104,6 +148,8 @@ class Product(models.Model):
         verbose_name=_("Updated")
     )
 
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Product")
         verbose_name_plural = _("Products")
@@ -159,7 +205,10 @@ class Product(models.Model):
         """
         return f"{self.price:.2f} EUR"
     
-    def increase_stock(self, quantity):
-        """Increase product stock."""
-        self.stock += quantity
-        self.save(update_fields=['stock'])
\ No newline at end of file
+    def increase_stock(self, quantity, note=''):
+        """Increase product stock (atomic UPDATE recorded as a restock movement)."""
+        from ..services.inventory_service import inventory_ledger
+
+        inventory_ledger.adjust(self.pk, quantity, kind=STOCK_MOVEMENT_RESTOCK, note=note)
+        self.refresh_from_db(fields=['stock'])
+        bump_catalog_version([self.category_id])
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+ProductRecommendation Model: Precomputed "bought together" neighbours.
+"""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class ProductRecommendation(models.Model):
+    """
+    One of the top-K co-purchased products of a product.
+
+    Rows are written by the ``refresh_recommendations`` batch job and
+    read by the product page with one lookup on ``(product, rank)``.
+
+    Attributes:
+        product (ForeignKey): Product the recommendation is shown on
+        recommended (ForeignKey): Recommended product
+        score (int): Number of orders containing both products
+        rank (int): Position among the product's recommendations (0 = best)
+    """
+
+    product = models.ForeignKey(
+        'Product',
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name=_("Product")
+    )
+
+    recommended = models.ForeignKey(
+        'Product',
+        on_delete=models.CASCADE,
+        related_name='recommended_by',
+        verbose_name=_("Recommended Product")
+    )
+
+    score = models.PositiveIntegerField(
+        verbose_name=_("Score")
+    )
+
+    rank = models.PositiveSmallIntegerField(
+        verbose_name=_("Rank")
+    )
+
+    class Meta:
+        verbose_name = _("Product Recommendation")
+        verbose_name_plural = _("Product Recommendations")
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'], name='unique_product_recommendation_rank'),
+            models.UniqueConstraint(fields=['product', 'recommended'], name='unique_product_recommendation'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.recommended_id} ({self.score})"
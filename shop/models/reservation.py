@@ -0,0 +1,62 @@
+"""
+StockReservation Model: Temporary holds on product stock during checkout.
+"""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class StockReservation(models.Model):
+    """
+    Units of a product held for one cart until ``expires_at``.
+
+    Active holds are subtracted from ``Product.stock`` in availability
+    checks and turned into a permanent decrement when the order is
+    created. Expired holds are ignored and removed in bulk by the
+    ``expire_reservations`` command.
+
+    Attributes:
+        holder (str): Cart owner ("user:<id>" or "session:<key>")
+        product (ForeignKey): Held product
+        quantity (int): Units held
+        expires_at (datetime): End of the hold
+        created_at (datetime): Creation timestamp
+    """
+
+    holder = models.CharField(
+        max_length=64,
+        verbose_name=_("Holder")
+    )
+
+    product = models.ForeignKey(
+        'Product',
+        on_delete=models.CASCADE,
+        related_name='reservations',
+        verbose_name=_("Product")
+    )
+
+    quantity = models.PositiveIntegerField(
+        verbose_name=_("Quantity")
+    )
+
+    expires_at = models.DateTimeField(
+        verbose_name=_("Expires At")
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Created")
+    )
+
+    class Meta:
+        verbose_name = _("Stock Reservation")
+        verbose_name_plural = _("Stock Reservations")
+        constraints = [
+            models.UniqueConstraint(fields=['holder', 'product'], name='unique_holder_product'),
+        ]
+        indexes = [
+            models.Index(fields=['product', 'expires_at']),
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.holder}: {self.product_id} x{self.quantity}"
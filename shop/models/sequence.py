@@ -0,0 +1,42 @@
+"""
+Sequence Model: Named counters for identifiers such as order numbers.
+"""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class Sequence(models.Model):
+    """
+    Named monotonic counter.
+
+    Workers reserve blocks of values by incrementing ``next_value``
+    with a single UPDATE, so allocation never scans other tables.
+
+    Attributes:
+        name (str): Unique sequence name
+        next_value (int): First value not yet handed out
+        updated_at (datetime): Last reservation timestamp
+    """
+
+    name = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name=_("Name")
+    )
+
+    next_value = models.PositiveBigIntegerField(
+        default=1,
+        verbose_name=_("Next Value")
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Updated")
+    )
+
+    class Meta:
+        verbose_name = _("Sequence")
+        verbose_name_plural = _("Sequences")
+
+    def __str__(self):
+        return f"{self.name} ({self.next_value})"
@@ -0,0 +1,76 @@
+"""
+StockMovement Model: Append-only ledger of product stock changes.
+"""
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from ..constants import STOCK_MOVEMENT_CHOICES
+
+
+class StockMovement(models.Model):
+    """
+    One change of a product's stock.
+
+    Rows are only ever inserted (in bulk, by the inventory ledger) and
+    deleted by compaction once rolled into the product's StockSnapshot.
+    ``Product.stock`` is the materialized balance: snapshot quantity
+    plus the sum of the remaining movements.
+
+    Attributes:
+        product (ForeignKey): Product whose stock changed
+        kind (str): Sale, cancel, restock or adjustment
+        quantity (int): Signed change (negative for sales)
+        order (ForeignKey): Order that caused the change, if any
+        note (str): Free text (ex: who adjusted the stock)
+        created_at (datetime): Movement timestamp
+    """
+
+    product = models.ForeignKey(
+        'Product',
+        on_delete=models.CASCADE,
+        related_name='stock_movements',
+        verbose_name=_("Product")
+    )
+
+    kind = models.CharField(
+        max_length=20,
+        choices=STOCK_MOVEMENT_CHOICES,
+        verbose_name=_("Kind")
+    )
+
+    quantity = models.IntegerField(
+        verbose_name=_("Quantity")
+    )
+
+    order = models.ForeignKey(
+        'Order',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='stock_movements',
+        verbose_name=_("Order")
+    )
+
+    note = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        verbose_name=_("Note")
+    )
+
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_("Created")
+    )
+
+    class Meta:
+        verbose_name = _("Stock Movement")
+        verbose_name_plural = _("Stock Movements")
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}: {self.kind} {self.quantity:+d}"
@@ -0,0 +1,54 @@
+"""
+StockSnapshot Model: Compacted stock ledger balance of a product.
+"""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class StockSnapshot(models.Model):
+    """
+    Stock balance of a product as of ``as_of``.
+
+    Compaction adds old StockMovement rows into the snapshot and deletes
+    them, so a balance is rebuilt from one snapshot and recent movements.
+
+    Attributes:
+        product (OneToOneField): Product of the balance
+        quantity (int): Balance of every movement before ``as_of``
+        movements (int): Number of movements rolled in
+        as_of (datetime): Movements before this date are included
+        updated_at (datetime): Last compaction timestamp
+    """
+
+    product = models.OneToOneField(
+        'Product',
+        on_delete=models.CASCADE,
+        related_name='stock_snapshot',
+        verbose_name=_("Product")
+    )
+
+    quantity = models.IntegerField(
+        default=0,
+        verbose_name=_("Quantity")
+    )
+
+    movements = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Movements")
+    )
+
+    as_of = models.DateTimeField(
+        verbose_name=_("As Of")
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Updated")
+    )
+
+    class Meta:
+        verbose_name = _("Stock Snapshot")
+        verbose_name_plural = _("Stock Snapshots")
+
+    def __str__(self):
+        return f"{self.product_id}: {self.quantity} as of {self.as_of:%Y-%m-%d}"
@@ -0,0 +1,109 @@
+"""
+Cart badge: the navbar item count kept in a signed cookie.
+
+The count is stamped with a version that increases whenever it changes,
+so the count endpoint and the navbar can answer from the cookie alone,
+without loading the session or the cart storage.
+
+CartMiddleware refreshes the cookie at the end of every request that
+loaded or changed the cart; requests that never touch the cart leave
+it alone.
+"""
+from django.conf import settings
+from .cart_storage import CART_STORAGE_REQUEST_ATTR, get_cart_storage
+
+# Cookie holding "count:version"
+CART_BADGE_COOKIE = 'cart_badge'
+
+# Salt of the cookie signature
+CART_BADGE_SALT = 'shop.cart_badge'
+
+# Request attribute set when the badge must be recomputed (ex: logout)
+CART_BADGE_STALE_REQUEST_ATTR = '_cart_badge_stale'
+
+
+class CartBadge:
+    """
+    Version-stamped cart item count.
+
+    Attributes:
+        count (int): Total number of units in cart
+        version (int): Increased on every count change
+    """
+
+    def __init__(self, count: int, version: int):
+        self.count = count
+        self.version = version
+
+    @property
+    def etag(self) -> str:
+        """ETag of the count endpoint (count included for lost cookies)."""
+        return f'"{self.version}.{self.count}"'
+
+
+def read_cart_badge(request):
+    """
+    Get the badge from the request cookie.
+
+    Returns:
+        CartBadge: The badge, or None if missing or tampered with
+    """
+    value = request.get_signed_cookie(CART_BADGE_COOKIE, default=None, salt=CART_BADGE_SALT)
+    if value is None:
+        return None
+    try:
+        count, version = (int(part) for part in value.split(':'))
+    except ValueError:
+        return None
+    return CartBadge(count, version)
+
+
+def get_cart_count(request) -> int:
+    """
+    Get the cart item count at the lowest available cost.
+
+    Uses the cart already loaded by this request if any, then the badge
+    cookie, and only loads the cart storage when neither is available.
+    """
+    storage = getattr(request, CART_STORAGE_REQUEST_ATTR, None)
+    if storage is None or not storage.is_loaded:
+        badge = read_cart_badge(request)
+        if badge is not None and not getattr(request, CART_BADGE_STALE_REQUEST_ATTR, False):
+            return badge.count
+        storage = get_cart_storage(request)
+    return storage.item_count
+
+
+def invalidate_cart_badge(request):
+    """Recompute the badge at the end of the request."""
+    setattr(request, CART_BADGE_STALE_REQUEST_ATTR, True)
+
+
+def update_cart_badge(request, response):
+    """
+    Refresh the badge cookie from the cart loaded by this request.
+
+    The cookie is only rewritten when the count differs from the one
+    the client sent, so reads keep the same version and ETag.
+    """
+    if getattr(request, CART_BADGE_STALE_REQUEST_ATTR, False):
+        storage = get_cart_storage(request)
+    else:
+        storage = getattr(request, CART_STORAGE_REQUEST_ATTR, None)
+        if storage is None or not storage.is_loaded:
+            return
+
+    count = storage.item_count
+    badge = read_cart_badge(request)
+    if badge is not None and badge.count == count:
+        return
+
+    version = badge.version + 1 if badge is not None else 1
+    response.set_signed_cookie(
+        CART_BADGE_COOKIE,
+        f"{count}:{version}",
+        salt=CART_BADGE_SALT,
+        max_age=settings.SESSION_COOKIE_AGE,
+        httponly=True,
+        samesite='Lax'
+    )
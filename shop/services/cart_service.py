@@ -1,26 +1,100 @@
 """
 Cart business logic service.
-Handles session-based shopping cart operations.
+Handles shopping cart operations on top of a pluggable cart storage.
 """
 from decimal import Decimal
 from django.contrib.auth.models import User
-from ..models import Product
+from ..constants import MIN_QUANTITY, MAX_QUANTITY, MAX_CART_OPERATIONS
+from .cart_storage import (
+    CART_SESSION_KEY,
+    CART_DEFER_REQUEST_ATTR,
+    cart_write_stats,
+    get_cart_storage,
+)
+from .product_cache import product_cache
+from .reservation_service import stock_reservations
+
+
+class CartSnapshot:
+    """
+    Read-only view of the cart computed in a single pass.
+
+    Attributes:
+        items (list): Cart lines as dicts (product, quantity, price, subtotal)
+        total (Decimal): Sum of all line subtotals
+        item_count (int): Total number of units in cart
+    """
+
+    def __init__(self, items, total, item_count):
+        self.items = items
+        self.total = total
+        self.item_count = item_count
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+    def as_dict(self) -> dict:
+        """JSON-serializable form used by the cart API."""
+        return {
+            'items': [
+                {
+                    'product_id': item['product'].id,
+                    'name': item['product'].name,
+                    'quantity': item['quantity'],
+                    'price': str(item['price']),
+                    'subtotal': str(item['subtotal']),
+                }
+                for item in self.items
+            ],
+            'total': str(self.total),
+            'item_count': self.item_count,
+        }
+
+
+class CartOperationError(Exception):
+    """
+    Raised when a batch of cart operations cannot be applied.
+
+    Attributes:
+        errors (list): Dicts with the operation ``index`` and an ``error`` message
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} invalid cart operation(s)")
 
 
 class CartService:
-    """Session-based shopping cart manager."""
+    """Shopping cart manager (storage selected by CART_STORAGE_BACKEND)."""
     
-    CART_SESSION_KEY = 'cart'
+    CART_SESSION_KEY = CART_SESSION_KEY
+
+    # Request attribute holding the memoized CartSnapshot
+    SNAPSHOT_REQUEST_ATTR = '_cart_snapshot'
+
+    # Operations accepted by apply_operations
+    OP_ADD = 'add'
+    OP_UPDATE = 'update'
+    OP_REMOVE = 'remove'
     
     def __init__(self, request):
         """Initialize CartService with request object."""
         self.request = request
         self.session = request.session
-        self.cart = self.session.get(self.CART_SESSION_KEY, {})
+        self.storage = get_cart_storage(request)
+        self.cart = self.storage.load()
     
     def add_to_cart(self, product_id: int, quantity: int = 1) -> bool:
         """
         Add product to cart.
+
+        Units held by other carts at checkout are not available.
         
         Args:
             product_id: Product ID to add
@@ -29,27 +103,25 @@ class CartService:
         Returns:
             bool: True if successful, False if product unavailable
         """
-        try:
-            product = Product.objects.get(id=product_id)
-            
-            if not product.is_available or product.stock < quantity:
-                return False
-            
-            product_id_str = str(product_id)
-            
-            if product_id_str in self.cart:
-                self.cart[product_id_str]['quantity'] += quantity
-            else:
-                self.cart[product_id_str] = {
-                    'quantity': quantity,
-                    'price': str(product.price),
-                }
-            
-            self._save_cart()
-            return True
-            
-        except Product.DoesNotExist:
+        product = product_cache.get(product_id, self.request)
+        if product is None:
+            return False
+        
+        if not product.is_available or self._available(product) < quantity:
             return False
+        
+        product_id_str = str(product_id)
+        
+        if product_id_str in self.cart:
+            self.cart[product_id_str]['quantity'] += quantity
+        else:
+            self.cart[product_id_str] = {
+                'quantity': quantity,
+                'price': str(product.price),
+            }
+        
+        self._save_line(product_id_str)
+        return True
     
     def remove_from_cart(self, product_id: int) -> bool:
         """Remove product from cart."""
@@ -57,7 +129,8 @@ class CartService:
         
         if product_id_str in self.cart:
             del self.cart[product_id_str]
-            self._save_cart()
+            self.storage.delete_line(product_id_str)
+            self._changed()
             return True
         
         return False
@@ -72,58 +145,263 @@ class CartService:
         if quantity <= 0:
             return self.remove_from_cart(product_id)
         
-        try:
-            product = Product.objects.get(id=product_id)
-            
-            if product.stock < quantity:
-                return False
-            
-            self.cart[product_id_str]['quantity'] = quantity
-            self._save_cart()
-            return True
-            
-        except Product.DoesNotExist:
+        product = product_cache.get(product_id, self.request)
+        if product is None or self._available(product) < quantity:
             return False
+        
+        self.cart[product_id_str]['quantity'] = quantity
+        self._save_line(product_id_str)
+        return True
+
+    def apply_operations(self, operations: list) -> CartSnapshot:
+        """
+        Apply a batch of add / update / remove operations atomically.
+
+        Every product involved is loaded with one query, and stock is
+        checked against the final quantity of each line. If any operation
+        is invalid nothing is changed.
+
+        Args:
+            operations: Dicts with ``op``, ``product_id`` and ``quantity``
+                (quantity is ignored for remove)
+
+        Returns:
+            CartSnapshot: The cart after the operations
+
+        Raises:
+            CartOperationError: If any operation is invalid
+        """
+        if len(operations) > MAX_CART_OPERATIONS:
+            raise CartOperationError([
+                {'index': None, 'error': f'At most {MAX_CART_OPERATIONS} operations per request'}
+            ])
+
+        errors = []
+        parsed = []
+        for index, operation in enumerate(operations):
+            try:
+                parsed.append(self._parse_operation(operation))
+            except ValueError as e:
+                errors.append({'index': index, 'error': str(e)})
+        if errors:
+            raise CartOperationError(errors)
+
+        products = product_cache.get_many(
+            {int(product_id_str) for product_id_str in self.cart}
+            | {product_id for op, product_id, quantity in parsed},
+            self.request
+        )
+
+        # Work on a copy so a failed batch leaves the cart untouched
+        cart = {product_id_str: dict(line) for product_id_str, line in self.cart.items()}
+        for index, (op, product_id, quantity) in enumerate(parsed):
+            product_id_str = str(product_id)
+            product = products.get(product_id)
+
+            if op == self.OP_REMOVE:
+                cart.pop(product_id_str, None)
+            elif product is None:
+                errors.append({'index': index, 'error': 'Product not found'})
+            elif op == self.OP_ADD:
+                if not product.is_available:
+                    errors.append({'index': index, 'error': f'{product.name} is not available'})
+                elif product_id_str in cart:
+                    cart[product_id_str]['quantity'] += quantity
+                else:
+                    cart[product_id_str] = {'quantity': quantity, 'price': str(product.price)}
+            elif product_id_str not in cart:
+                errors.append({'index': index, 'error': f'{product.name} is not in the cart'})
+            elif quantity == 0:
+                del cart[product_id_str]
+            else:
+                cart[product_id_str]['quantity'] = quantity
+
+        # Check each touched line once, reported on its last operation
+        last_index = {product_id: index for index, (op, product_id, quantity) in enumerate(parsed)}
+        available = stock_reservations.available_quantities(
+            [products[product_id] for product_id in last_index if product_id in products],
+            exclude_holder=self._holder(),
+            fresh_stock=True
+        )
+        for product_id, index in last_index.items():
+            line = cart.get(str(product_id))
+            product = products.get(product_id)
+            if line is None or product is None:
+                continue
+            if line['quantity'] > MAX_QUANTITY:
+                errors.append({'index': index, 'error': f'At most {MAX_QUANTITY} units per product'})
+            elif available[product_id] < line['quantity']:
+                errors.append({'index': index, 'error': f'Only {available[product_id]} units of {product.name} available'})
+        if errors:
+            raise CartOperationError(sorted(errors, key=lambda error: error['index']))
+
+        for product_id_str in map(str, last_index):
+            line = cart.get(product_id_str)
+            if line is None:
+                if product_id_str in self.cart:
+                    del self.cart[product_id_str]
+                    self.storage.delete_line(product_id_str)
+            elif line != self.cart.get(product_id_str):
+                self.cart[product_id_str] = line
+                self.storage.save_line(product_id_str, line)
+        self._changed()
+
+        snapshot = self._build_snapshot(products)
+        setattr(self.request, self.SNAPSHOT_REQUEST_ATTR, snapshot)
+        return snapshot
+
+    def get_snapshot(self) -> CartSnapshot:
+        """
+        Get the cart snapshot for the current request.
+
+        The snapshot is built once and memoized on the request, so views,
+        templates and context processors share the same product query.
+
+        Returns:
+            CartSnapshot: Cart lines, total and item count
+        """
+        snapshot = getattr(self.request, self.SNAPSHOT_REQUEST_ATTR, None)
+        if snapshot is None:
+            snapshot = self._build_snapshot()
+            setattr(self.request, self.SNAPSHOT_REQUEST_ATTR, snapshot)
+        return snapshot
     
     def get_cart_items(self):
         """Get cart items with full product data."""
-        items = []
-        
-        for product_id_str, item_data in self.cart.items():
-            try:
-                product = Product.objects.get(id=int(product_id_str))
-                items.append({
-                    'product': product,
-                    'quantity': item_data['quantity'],
-                    'price': Decimal(item_data['price']),
-                    'subtotal': Decimal(item_data['price']) * item_data['quantity'],
-                })
-            except Product.DoesNotExist:
-                # Rimuovi prodotti eliminati
-                del self.cart[product_id_str]
-        
-        self._save_cart()
-        return items
+        return self.get_snapshot().items
     
     def get_total(self) -> Decimal:
         """Calculate cart total."""
-        total = Decimal('0.00')
-        
-        for item in self.get_cart_items():
-            total += item['subtotal']
-        
-        return total
+        return self.get_snapshot().total
     
     def get_item_count(self) -> int:
         """Get total number of items in cart."""
+        snapshot = getattr(self.request, self.SNAPSHOT_REQUEST_ATTR, None)
+        if snapshot is not None:
+            return snapshot.item_count
         return sum(item['quantity'] for item in self.cart.values())
     
     def clear_cart(self):
         """Clear entire cart."""
-        self.cart = {}
-        self._save_cart()
+        self.cart.clear()
+        self.storage.clear()
+        self._changed()
+
+    def merge_anonymous_cart(self, user):
+        """Merge the anonymous cart into the cart of ``user`` after login."""
+        self.storage.merge_anonymous_cart(user)
+        self.cart = self.storage.load()
+        self._changed()
+
+    def _build_snapshot(self, products: dict = None) -> CartSnapshot:
+        """
+        Load all cart products (product cache, one query for misses)
+        and compute totals.
+
+        Args:
+            products: Products already loaded by id (skips the lookup)
+        """
+        if products is None:
+            products = product_cache.get_many(self.cart, self.request)
+
+        items = []
+        total = Decimal('0.00')
+        item_count = 0
+        stale_ids = []
+
+        for product_id_str, item_data in self.cart.items():
+            product = products.get(int(product_id_str))
+            if product is None:
+                stale_ids.append(product_id_str)
+                continue
+
+            price = Decimal(item_data['price'])
+            subtotal = price * item_data['quantity']
+            items.append({
+                'product': product,
+                'quantity': item_data['quantity'],
+                'price': price,
+                'subtotal': subtotal,
+            })
+            total += subtotal
+            item_count += item_data['quantity']
+
+        # Remove deleted products; a clean read writes nothing
+        if stale_ids:
+            for product_id_str in stale_ids:
+                del self.cart[product_id_str]
+                self.storage.delete_line(product_id_str)
+            self._flush_unless_deferred()
+        else:
+            cart_write_stats.record_avoided()
+
+        return CartSnapshot(items, total, item_count)
     
-    def _save_cart(self):
-        """Save cart to session."""
-        self.session[self.CART_SESSION_KEY] = self.cart
-        self.session.modified = True
+    def _parse_operation(self, operation):
+        """
+        Validate one raw operation.
+
+        Returns:
+            tuple: (op, product_id, quantity)
+
+        Raises:
+            ValueError: If the operation is malformed
+        """
+        if not isinstance(operation, dict):
+            raise ValueError('Operation must be an object')
+
+        op = operation.get('op')
+        if op not in (self.OP_ADD, self.OP_UPDATE, self.OP_REMOVE):
+            raise ValueError(f'Unknown operation: {op}')
+
+        try:
+            product_id = int(operation.get('product_id'))
+        except (TypeError, ValueError):
+            raise ValueError('Invalid product_id')
+
+        if op == self.OP_REMOVE:
+            return op, product_id, 0
+
+        try:
+            quantity = int(operation.get('quantity', 1))
+        except (TypeError, ValueError):
+            raise ValueError('Invalid quantity')
+
+        # Like update_quantity, updating to 0 removes the line
+        minimum = MIN_QUANTITY if op == self.OP_ADD else 0
+        if not minimum <= quantity <= MAX_QUANTITY:
+            raise ValueError(f'Quantity must be between {minimum} and {MAX_QUANTITY}')
+
+        return op, product_id, quantity
+
+    def _holder(self):
+        """Reservation holder of this cart (None if it cannot hold stock yet)."""
+        return stock_reservations.get_holder(self.request, create=False)
+
+    def _available(self, product) -> int:
+        """Stock of a product not held by other carts (read fresh, not from the product cache)."""
+        return stock_reservations.available_quantities(
+            [product], exclude_holder=self._holder(), fresh_stock=True
+        )[product.id]
+
+    def _save_line(self, product_id_str: str):
+        """Persist one cart line."""
+        self.storage.save_line(product_id_str, self.cart[product_id_str])
+        self._changed()
+
+    def _changed(self):
+        """Drop the memoized snapshot and write changes if not deferred."""
+        self._invalidate_snapshot()
+        self._flush_unless_deferred()
+
+    def _flush_unless_deferred(self):
+        """
+        Write pending changes now, unless CartMiddleware will write
+        them once at the end of the request.
+        """
+        if not getattr(self.request, CART_DEFER_REQUEST_ATTR, False):
+            self.storage.flush()
+
+    def _invalidate_snapshot(self):
+        """Drop the snapshot memoized on the request."""
+        setattr(self.request, self.SNAPSHOT_REQUEST_ATTR, None)
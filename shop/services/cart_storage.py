@@ -0,0 +1,360 @@
+"""
+Cart storage backends.
+
+CartService keeps the cart as a dict of ``{product_id_str: {'quantity',
+'price'}}`` and delegates persistence to one of these backends, selected
+with the ``CART_STORAGE_BACKEND`` setting.
+
+Backends track changed lines and write them in one batch on ``flush()``,
+which CartMiddleware calls once at the end of the request. Reads never
+write.
+"""
+import logging
+import threading
+import uuid
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.module_loading import import_string
+from ..constants import CART_CACHE_TIMEOUT, MAX_QUANTITY
+from ..models import Cart, CartLine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CART_STORAGE_BACKEND = 'shop.services.cart_storage.SessionCartStorage'
+
+# Session key holding the cart dict (session backend)
+CART_SESSION_KEY = 'cart'
+
+# Session key holding the anonymous owner token (database and cache backends)
+CART_TOKEN_SESSION_KEY = 'cart_token'
+
+# Request attribute holding the cart storage shared by the request
+CART_STORAGE_REQUEST_ATTR = '_cart_storage'
+
+# Request attribute set by CartMiddleware: writes are flushed at the end
+CART_DEFER_REQUEST_ATTR = '_cart_defer_writes'
+
+
+class CartWriteStats:
+    """
+    Process-wide counters of cart writes.
+
+    Attributes:
+        writes (int): Flushes that persisted changes
+        writes_avoided (int): Reads and coalesced mutations that did not write
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.writes_avoided = 0
+
+    def record_write(self):
+        with self._lock:
+            self.writes += 1
+
+    def record_avoided(self, count: int = 1):
+        with self._lock:
+            self.writes_avoided += count
+
+    def as_dict(self) -> dict:
+        return {'writes': self.writes, 'writes_avoided': self.writes_avoided}
+
+
+cart_write_stats = CartWriteStats()
+
+
+def get_cart_storage(request):
+    """Get the cart storage of a request, shared by every CartService."""
+    storage = getattr(request, CART_STORAGE_REQUEST_ATTR, None)
+    if storage is None:
+        path = getattr(settings, 'CART_STORAGE_BACKEND', DEFAULT_CART_STORAGE_BACKEND)
+        storage = import_string(path)(request)
+        setattr(request, CART_STORAGE_REQUEST_ATTR, storage)
+    return storage
+
+
+class BaseCartStorage:
+    """
+    Interface for cart storage backends.
+
+    Subclasses implement ``_read()`` and ``_write()``; this class keeps
+    the loaded cart and the pending changes between them.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.session = request.session
+        self._cart = None
+        self._changes = {}
+        self._cleared = False
+
+    def load(self) -> dict:
+        """Return the current cart dict (read once per request)."""
+        if self._cart is None:
+            self._cart = self._read()
+        return self._cart
+
+    def save_line(self, product_id_str: str, line: dict):
+        """Mark one cart line as inserted or updated."""
+        self._mark(product_id_str, line)
+
+    def delete_line(self, product_id_str: str):
+        """Mark one cart line as deleted."""
+        self._mark(product_id_str, None)
+
+    def clear(self):
+        """Mark the whole cart as deleted."""
+        if self.is_dirty:
+            cart_write_stats.record_avoided()
+        self._changes = {}
+        self._cleared = True
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the cart has been read during this request."""
+        return self._cart is not None
+
+    @property
+    def item_count(self) -> int:
+        """Total number of units in cart."""
+        return sum(line['quantity'] for line in self.load().values())
+
+    @property
+    def is_dirty(self) -> bool:
+        """Whether there are changes not yet written."""
+        return self._cleared or bool(self._changes)
+
+    def flush(self):
+        """Write pending changes in one batch."""
+        if not self.is_dirty:
+            return
+        self._write(self._cleared, self._changes)
+        self._changes = {}
+        self._cleared = False
+        cart_write_stats.record_write()
+
+    def merge_anonymous_cart(self, user):
+        """
+        Merge the anonymous cart into the cart of ``user``, who just logged in.
+
+        Args:
+            user: User given by the ``user_logged_in`` signal
+        """
+
+    def _mark(self, product_id_str, line):
+        if self.is_dirty:
+            # Coalesced into the write already pending for this request
+            cart_write_stats.record_avoided()
+        self._changes[product_id_str] = line
+
+    def _read(self) -> dict:
+        raise NotImplementedError
+
+    def _write(self, cleared: bool, changes: dict):
+        """
+        Persist changes.
+
+        Args:
+            cleared: Whether the cart was cleared before ``changes``
+            changes: ``{product_id_str: line}``, line None means deleted
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def merge_lines(target: dict, source: dict) -> dict:
+        """
+        Merge cart lines, adding quantities of products in both carts.
+
+        Returns:
+            dict: Lines of ``target`` changed by the merge
+        """
+        changed = {}
+        for product_id_str, line in source.items():
+            if product_id_str in target:
+                quantity = min(target[product_id_str]['quantity'] + line['quantity'], MAX_QUANTITY)
+                target[product_id_str]['quantity'] = quantity
+            else:
+                target[product_id_str] = dict(line)
+            changed[product_id_str] = target[product_id_str]
+        return changed
+
+
+class SessionCartStorage(BaseCartStorage):
+    """
+    Store the cart inside the Django session.
+
+    The session is only marked modified on flush, so viewing the cart
+    never causes a session UPDATE. Login keeps session data, so there
+    is nothing to merge.
+    """
+
+    def _read(self) -> dict:
+        return self.session.get(CART_SESSION_KEY, {})
+
+    def _write(self, cleared: bool, changes: dict):
+        cart = {} if cleared else self.session.get(CART_SESSION_KEY, {})
+        for product_id_str, line in changes.items():
+            if line is None:
+                cart.pop(product_id_str, None)
+            else:
+                cart[product_id_str] = line
+        self.session[CART_SESSION_KEY] = cart
+        self.session.modified = True
+
+
+class OwnerCartStorage(BaseCartStorage):
+    """
+    Base for backends that store carts outside the session.
+
+    Carts are owned by the user when authenticated, otherwise by a
+    random token kept in the session. The token (unlike the session
+    key) survives the key rotation done by login, so the anonymous
+    cart can be found and merged afterwards.
+    """
+
+    def __init__(self, request):
+        super().__init__(request)
+        self._user = None
+
+    @property
+    def user(self):
+        """
+        Owner of the cart.
+
+        The user given to merge_anonymous_cart wins: requests built by
+        ``Client.login()`` or other callers of ``login()`` may have no
+        ``request.user``.
+        """
+        return self._user or getattr(self.request, 'user', None)
+
+    def merge_anonymous_cart(self, user):
+        self.flush()
+        self._user = user
+        self._cart = None
+
+        token = self.session.pop(CART_TOKEN_SESSION_KEY, None)
+        if token is None:
+            return
+
+        source = self._read_anonymous(token)
+        if source:
+            self._changes.update(self.merge_lines(self.load(), source))
+            self.flush()
+        self._delete_anonymous(token)
+
+    def _get_token(self, create=False):
+        token = self.session.get(CART_TOKEN_SESSION_KEY)
+        if token is None and create:
+            token = uuid.uuid4().hex
+            self.session[CART_TOKEN_SESSION_KEY] = token
+        return token
+
+    def _is_user(self):
+        return self.user is not None and self.user.is_authenticated
+
+    def _read_anonymous(self, token) -> dict:
+        raise NotImplementedError
+
+    def _delete_anonymous(self, token):
+        raise NotImplementedError
+
+
+class DatabaseCartStorage(OwnerCartStorage):
+    """Store carts in the Cart / CartLine tables with batched upserts."""
+
+    def _read(self) -> dict:
+        if self._is_user():
+            return self._read_lines(CartLine.objects.filter(cart__user=self.user))
+        token = self._get_token()
+        if token is None:
+            return {}
+        return self._read_anonymous(token)
+
+    def _write(self, cleared: bool, changes: dict):
+        cart_id = self._get_cart_id()
+        deleted = [int(product_id_str) for product_id_str, line in changes.items() if line is None]
+        upserted = {product_id_str: line for product_id_str, line in changes.items() if line is not None}
+
+        with transaction.atomic():
+            lines = CartLine.objects.filter(cart_id=cart_id)
+            if cleared:
+                lines.delete()
+            elif deleted:
+                lines.filter(product_id__in=deleted).delete()
+
+            if upserted:
+                CartLine.objects.bulk_create(
+                    [
+                        CartLine(
+                            cart_id=cart_id,
+                            product_id=int(product_id_str),
+                            quantity=line['quantity'],
+                            price=Decimal(line['price'])
+                        )
+                        for product_id_str, line in upserted.items()
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['cart', 'product'],
+                    update_fields=['quantity', 'price']
+                )
+
+    def _read_anonymous(self, token) -> dict:
+        return self._read_lines(CartLine.objects.filter(cart__token=token))
+
+    def _delete_anonymous(self, token):
+        Cart.objects.filter(token=token).delete()
+
+    def _get_cart_id(self):
+        if self._is_user():
+            cart, created = Cart.objects.get_or_create(user=self.user)
+        else:
+            cart, created = Cart.objects.get_or_create(token=self._get_token(create=True))
+        return cart.pk
+
+    @staticmethod
+    def _read_lines(lines) -> dict:
+        return {
+            str(product_id): {'quantity': quantity, 'price': str(price)}
+            for product_id, quantity, price in lines.values_list('product_id', 'quantity', 'price')
+        }
+
+
+class CacheCartStorage(OwnerCartStorage):
+    """
+    Store carts in the Django cache framework.
+
+    In-process with the default local-memory cache, shared across
+    workers with a Redis or Memcached ``CACHES`` backend.
+    """
+
+    KEY_PREFIX = 'cart'
+
+    def _read(self) -> dict:
+        key = self._key()
+        return cache.get(key, {}) if key else {}
+
+    def _write(self, cleared: bool, changes: dict):
+        # The loaded dict already holds every change
+        key = self._key(create=True)
+        if self.load():
+            cache.set(key, self.load(), CART_CACHE_TIMEOUT)
+        else:
+            cache.delete(key)
+
+    def _read_anonymous(self, token) -> dict:
+        return cache.get(self._token_key(token), {})
+
+    def _delete_anonymous(self, token):
+        cache.delete(self._token_key(token))
+
+    def _key(self, create=False):
+        if self._is_user():
+            return f"{self.KEY_PREFIX}:user:{self.user.pk}"
+        token = self._get_token(create=create)
+        return self._token_key(token) if token else None
+
+    def _token_key(self, token):
+        return f"{self.KEY_PREFIX}:token:{token}"
@@ -0,0 +1,125 @@
+"""
+Catalog cache versions.
+Cache keys of catalog data embed a version number that is bumped when
+products or categories change, so invalidation is one cache write
+(old entries are never looked up again and simply expire).
+
+- The catalog version covers the whole catalog (lists, facets).
+- A category version covers data of one category (detail page
+  fragments); it also embeds an epoch bumped by changes that cannot be
+  traced to categories, such as bulk updates.
+- The recommendations version covers the precomputed recommendations
+  shown on product pages.
+- The categories version tells every process to reload its in-memory
+  category registry.
+- The images version covers fragments rendering product images; it is
+  bumped when resized images become available.
+"""
+import hashlib
+import time
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOG_VERSION_KEY = 'catalog_version'
+CATEGORY_EPOCH_KEY = 'catalog_version:epoch'
+RECOMMENDATIONS_VERSION_KEY = 'catalog_version:recommendations'
+CATEGORIES_VERSION_KEY = 'catalog_version:categories'
+IMAGES_VERSION_KEY = 'catalog_version:images'
+
+
+def _category_key(category_id) -> str:
+    return f"catalog_version:category:{category_id}"
+
+
+def _seed() -> int:
+    # Milliseconds: a version lost to eviction restarts above old values
+    return int(time.time() * 1000)
+
+
+def _get(key) -> int:
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _seed(), None)
+        version = cache.get(key)
+    return version
+
+
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _seed(), None)
+
+
+def get_catalog_version() -> int:
+    """Get the current catalog version."""
+    return _get(CATALOG_VERSION_KEY)
+
+
+def get_category_version(category_id) -> str:
+    """Get the current version of one category ("<epoch>.<version>")."""
+    keys = [CATEGORY_EPOCH_KEY, _category_key(category_id)]
+    versions = cache.get_many(keys)
+    return '.'.join(
+        str(versions[key] if key in versions else _get(key)) for key in keys
+    )
+
+
+def bump_catalog_version(category_ids=None):
+    """
+    Invalidate cached catalog data.
+
+    The bump runs once the current transaction commits, so no request
+    can cache pre-commit data under the new version.
+
+    Args:
+        category_ids: Categories whose data changed; None when unknown
+            (every category version is bumped)
+    """
+    category_ids = None if category_ids is None else set(category_ids) - {None}
+
+    def bump():
+        _incr(CATALOG_VERSION_KEY)
+        if category_ids is None:
+            _incr(CATEGORY_EPOCH_KEY)
+        else:
+            for category_id in category_ids:
+                _incr(_category_key(category_id))
+
+    transaction.on_commit(bump)
+
+
+def get_recommendations_version() -> int:
+    """Get the current version of the stored recommendations."""
+    return _get(RECOMMENDATIONS_VERSION_KEY)
+
+
+def bump_recommendations_version():
+    """Invalidate cached recommendations once the transaction commits."""
+    transaction.on_commit(lambda: _incr(RECOMMENDATIONS_VERSION_KEY))
+
+
+def get_categories_version() -> int:
+    """Get the current version of the category list."""
+    return _get(CATEGORIES_VERSION_KEY)
+
+
+def bump_categories_version():
+    """Make every process reload its category registry once the transaction commits."""
+    transaction.on_commit(lambda: _incr(CATEGORIES_VERSION_KEY))
+
+
+def get_images_version() -> int:
+    """Get the current version of the product image URLs."""
+    return _get(IMAGES_VERSION_KEY)
+
+
+def bump_images_version():
+    """Re-render fragments with product images (not tied to a transaction)."""
+    _incr(IMAGES_VERSION_KEY)
+
+
+def get_page_cache_key(request, version) -> str:
+    """Cache key of a whole rendered page (path, query string, version)."""
+    digest = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"catalog_page:{version}:{digest}"
@@ -0,0 +1,251 @@
+"""
+Catalog import service.
+Streams product rows from CSV or JSON Lines files and upserts them in
+batches keyed by slug.
+"""
+import csv
+import json
+import time
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from ..constants import (
+    CATALOG_IMPORT_BATCH_SIZE,
+    MAX_PRICE,
+    MAX_STOCK,
+    MIN_PRICE,
+    MIN_STOCK,
+    STOCK_MOVEMENT_ADJUSTMENT,
+)
+from ..models import Category, Product, StockMovement
+from .inventory_service import inventory_ledger
+
+IMPORT_FORMAT_CSV = 'csv'
+IMPORT_FORMAT_JSONL = 'jsonl'
+IMPORT_FORMATS = (IMPORT_FORMAT_CSV, IMPORT_FORMAT_JSONL)
+
+# Product fields overwritten when a row matches an existing slug
+UPSERT_FIELDS = ['name', 'category', 'price', 'description', 'stock', 'is_available', 'updated_at']
+
+SLUG_MAX_LENGTH = Product._meta.get_field('slug').max_length
+NAME_MAX_LENGTH = Product._meta.get_field('name').max_length
+
+# Errors kept in the stats (the rest are only counted)
+MAX_REPORTED_ERRORS = 20
+
+
+class InvalidRow(ValueError):
+    """A line of the file that is not a row (reported and skipped by the importer)."""
+
+
+def read_rows(path: str, import_format: str = None):
+    """
+    Stream rows of a catalog file as dicts.
+
+    Malformed JSON lines are yielded as InvalidRow, so one bad line does
+    not stop the stream.
+
+    Args:
+        path: CSV file with a header row, or JSON Lines file
+        import_format: "csv" or "jsonl" (default: from the file extension)
+    """
+    import_format = import_format or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+    if import_format not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format: {import_format}")
+
+    with open(path, newline='', encoding='utf-8') as source:
+        if import_format == IMPORT_FORMAT_CSV:
+            yield from csv.DictReader(source)
+        else:
+            for line in source:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield InvalidRow(f"invalid JSON: {e.msg}")
+                    continue
+                yield row if isinstance(row, dict) else InvalidRow("not a JSON object")
+
+
+class ImportStats:
+    """
+    Counters of an import run.
+
+    Attributes:
+        rows (int): Rows read
+        imported (int): Rows inserted or updated
+        skipped (int): Invalid rows
+        errors (list): First invalid rows as "row N: message"
+        elapsed (float): Seconds since the import started
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / max(self.elapsed, 1e-9)
+
+    def add_error(self, message: str):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"row {self.rows}: {message}")
+
+
+class CatalogImporter:
+    """
+    Upsert products from rows with ``name``, ``category``, ``price`` and
+    optional ``slug``, ``description``, ``stock``, ``is_available``.
+
+    Nothing is queried per row: categories are resolved from an
+    in-memory map (by slug or name, missing ones are created), slugs are
+    made unique in memory (``case``, ``case-2``, ...), and each batch is
+    one ``INSERT ... ON CONFLICT (slug) DO UPDATE`` in its own
+    transaction. Re-importing the same file updates the same products.
+    """
+
+    def __init__(self, batch_size: int = CATALOG_IMPORT_BATCH_SIZE, create_categories: bool = True):
+        """Initialize importer with the upsert batch size."""
+        self.batch_size = batch_size
+        self.create_categories = create_categories
+        self._categories = {}
+        self._slugs = set()
+        self._next_suffix = {}
+
+    def run(self, rows, on_batch=None) -> ImportStats:
+        """
+        Import rows in batches.
+
+        Args:
+            rows: Iterable of dicts (see read_rows)
+            on_batch: Called with the stats after each batch
+
+        Returns:
+            ImportStats: Counters of the run
+        """
+        stats = ImportStats()
+        self._load_categories()
+
+        batch = []
+        for row in rows:
+            stats.rows += 1
+            try:
+                batch.append(self._build_product(row))
+            except (ValueError, TypeError, KeyError) as e:
+                stats.add_error(str(e))
+                continue
+
+            if len(batch) >= self.batch_size:
+                self._upsert(batch, stats, on_batch)
+                batch = []
+
+        if batch:
+            self._upsert(batch, stats, on_batch)
+        return stats
+
+    def _upsert(self, batch, stats, on_batch):
+        with transaction.atomic():
+            # Rows stay locked until the upsert commits, so no sale can land
+            # between this read and the ledger delta computed from it
+            stock = dict(
+                Product.objects.select_for_update()
+                .filter(slug__in=[product.slug for product in batch])
+                .order_by('pk')
+                .values_list('slug', 'stock')
+            )
+            Product.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=['slug'],
+                update_fields=UPSERT_FIELDS
+            )
+            inventory_ledger.record([
+                StockMovement(
+                    product_id=product.pk,
+                    kind=STOCK_MOVEMENT_ADJUSTMENT,
+                    quantity=product.stock - stock.get(product.slug, 0),
+                    note='Catalog import'
+                )
+                for product in batch
+                if product.stock != stock.get(product.slug, 0)
+            ])
+        stats.imported += len(batch)
+        if on_batch is not None:
+            on_batch(stats)
+
+    def _load_categories(self):
+        for category_id, name, slug in Category.objects.values_list('id', 'name', 'slug'):
+            self._categories[slug] = category_id
+            self._categories[name.lower()] = category_id
+
+    def _category_id(self, value) -> int:
+        value = (value or '').strip()
+        if not value:
+            raise ValueError("missing category")
+
+        category_id = self._categories.get(value) or self._categories.get(value.lower())
+        if category_id is None:
+            if not self.create_categories:
+                raise ValueError(f"unknown category {value!r}")
+            category, _ = Category.objects.get_or_create(
+                slug=slugify(value), defaults={'name': value}
+            )
+            category_id = self._categories[value] = self._categories[value.lower()] = category.id
+        return category_id
+
+    def _unique_slug(self, value: str) -> str:
+        """Slug not used by an earlier row of this import (suffixed on collision)."""
+        base = slugify(value)[:SLUG_MAX_LENGTH] or 'product'
+        slug = base
+        while slug in self._slugs:
+            suffix = self._next_suffix.get(base, 2)
+            self._next_suffix[base] = suffix + 1
+            slug = f"{base[:SLUG_MAX_LENGTH - len(str(suffix)) - 1]}-{suffix}"
+        self._slugs.add(slug)
+        return slug
+
+    def _build_product(self, row) -> Product:
+        if isinstance(row, InvalidRow):
+            raise row
+
+        name = (row.get('name') or '').strip()[:NAME_MAX_LENGTH]
+        if not name:
+            raise ValueError("missing name")
+
+        try:
+            price = Decimal(str(row['price'])).quantize(Decimal('0.01'))
+            if not price.is_finite():
+                raise InvalidOperation
+        except (InvalidOperation, KeyError):
+            raise ValueError(f"invalid price {row.get('price')!r}")
+        if not MIN_PRICE <= price <= MAX_PRICE:
+            raise ValueError(f"price out of range: {price}")
+
+        stock = int(row.get('stock') or 0)
+        if not MIN_STOCK <= stock <= MAX_STOCK:
+            raise ValueError(f"stock out of range: {stock}")
+
+        is_available = row.get('is_available', True)
+        if isinstance(is_available, str):
+            is_available = is_available.strip().lower() not in ('0', 'false', 'no', '')
+
+        return Product(
+            name=name,
+            slug=self._unique_slug(row.get('slug') or name),
+            category_id=self._category_id(row.get('category')),
+            price=price,
+            description=row.get('description') or '',
+            stock=stock,
+            is_available=is_available,
+            updated_at=timezone.now()
+        )
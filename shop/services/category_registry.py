@@ -0,0 +1,62 @@
+"""
+Category registry.
+Active categories held in process memory, so category lists and
+slug lookups cost no query on the hot path.
+
+Each process rebuilds its copy when the shared registry version in the
+cache changes; Category saves and deletes bump that version, so every
+worker picks up the change on its next lookup.
+"""
+import threading
+from ..models import Category
+from .catalog_cache import get_categories_version
+
+
+class CategoryRegistry:
+    """
+    In-memory list of active categories (ordered by name).
+
+    Lookups check the shared version (one cache read) and reload the
+    categories with one query only when it changed.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry (loaded on first use)."""
+        self._version = None
+        self._categories = ()
+        self._by_slug = {}
+        self._by_id = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        version = get_categories_version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            categories = tuple(Category.objects.filter(is_active=True).order_by('name'))
+            # Swap whole mappings so readers never see a half-built registry
+            self._by_slug = {category.slug: category for category in categories}
+            self._by_id = {category.pk: category for category in categories}
+            self._categories = categories
+            self._version = version
+
+    def all(self) -> tuple:
+        """Get all active categories."""
+        self._refresh()
+        return self._categories
+
+    def get_by_slug(self, slug: str):
+        """Get an active category by slug (None if unknown or inactive)."""
+        self._refresh()
+        return self._by_slug.get(slug)
+
+    def get_by_id(self, category_id):
+        """Get an active category by id (None if unknown or inactive)."""
+        self._refresh()
+        return self._by_id.get(category_id)
+
+
+# Process-wide registry used by views and the context processor
+category_registry = CategoryRegistry()
@@ -0,0 +1,171 @@
+"""
+Checkout business logic service.
+Turns the current cart into an order inside a single transaction.
+"""
+import uuid
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from ..constants import MIN_STOCK
+from ..models import Product, Customer, Order, OrderItem
+from .cart_service import CartService
+from .catalog_cache import bump_catalog_version
+from .inventory_service import inventory_ledger
+from .order_number_service import order_number_allocator
+from .product_cache import product_cache
+from .reservation_service import InsufficientStockError, stock_reservations
+
+
+class CheckoutService:
+    """Create orders from the session cart."""
+
+    def __init__(self, request):
+        """Initialize CheckoutService with request object."""
+        self.request = request
+        self.cart_service = CartService(request)
+        self.holder = stock_reservations.get_holder(request)
+
+    def reserve_cart(self):
+        """
+        Hold stock for the cart while the customer fills in checkout.
+
+        Returns:
+            datetime: Expiry of the holds
+
+        Raises:
+            InsufficientStockError: If a line exceeds the available stock
+        """
+        return stock_reservations.reserve(self.holder, self.cart_service.get_cart_items())
+
+    @staticmethod
+    def new_idempotency_key() -> str:
+        """Get a token identifying one checkout form submission."""
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def find_submitted_order(idempotency_key: str):
+        """
+        Get the order already created by a submission.
+
+        Returns:
+            Order: The order, or None if the key was never used
+        """
+        if not idempotency_key:
+            return None
+        return Order.objects.filter(idempotency_key=idempotency_key).first()
+
+    def place_order(self, customer_data: dict, notes: str = '',
+                    idempotency_key: str = None) -> Order:
+        """
+        Create customer, order and order items, and decrement stock.
+
+        Everything runs in one transaction: if any line is out of stock
+        the whole checkout is rolled back and nothing is written. Units
+        held by other carts are never sold, and the cart's own holds are
+        released once its stock is decremented.
+
+        A repeated ``idempotency_key`` returns the order of the first
+        submission without writing anything. Concurrent duplicates are
+        caught by the unique index and rolled back.
+
+        Args:
+            customer_data: Customer fields (email, first_name, ...)
+            notes: Optional order notes
+            idempotency_key: Token of the form submission
+
+        Returns:
+            Order: The created order
+
+        Raises:
+            InsufficientStockError: If a product cannot cover its quantity
+        """
+        order = self.find_submitted_order(idempotency_key)
+        if order is not None:
+            return order
+
+        cart_items = self.cart_service.get_cart_items()
+        user = self.request.user if self.request.user.is_authenticated else None
+
+        # Allocated outside the transaction: a rolled back checkout
+        # just leaves a gap in the numbering
+        order_number = order_number_allocator.allocate_order_number()
+
+        try:
+            with transaction.atomic():
+                self._decrement_stock(cart_items)
+                stock_reservations.release(self.holder)
+
+                customer, created = Customer.objects.get_or_create(
+                    email=customer_data['email'],
+                    defaults={
+                        key: value for key, value in customer_data.items()
+                        if key != 'email'
+                    }
+                )
+
+                # Lines are bulk inserted, so totals are set here once
+                order = Order.objects.create(
+                    customer=customer,
+                    user=user,
+                    order_number=order_number,
+                    subtotal=sum((item['subtotal'] for item in cart_items), Decimal('0.00')),
+                    idempotency_key=idempotency_key or None,
+                    notes=notes
+                )
+
+                OrderItem.objects.bulk_create([
+                    OrderItem(
+                        order=order,
+                        product=item['product'],
+                        quantity=item['quantity'],
+                        unit_price=item['price']
+                    )
+                    for item in cart_items
+                ])
+                inventory_ledger.record_sales(order, cart_items)
+        except IntegrityError:
+            # A concurrent duplicate committed first
+            order = self.find_submitted_order(idempotency_key)
+            if order is None:
+                raise
+            return order
+
+        self.cart_service.clear_cart()
+        return order
+
+    def _decrement_stock(self, cart_items):
+        """
+        Decrement stock with conditional UPDATEs.
+
+        Each line runs ``UPDATE ... SET stock = stock - q WHERE stock >=
+        q + (units held by other carts)``, so oversell is detected from the
+        row count without SELECT FOR UPDATE. Lines are processed in product id order to keep lock order stable
+        across concurrent checkouts. The matching ledger movements are
+        recorded once the order exists.
+
+        Sell-outs are detected by re-reading the stock the UPDATEs left
+        (rows stay locked until commit), not from the cart's product
+        instances, which may come from the product cache.
+        """
+        held = stock_reservations.held_by_others(self.holder)
+        for item in sorted(cart_items, key=lambda item: item['product'].id):
+            updated = Product.objects.filter(
+                id=item['product'].id,
+                is_available=True,
+                stock__gte=held + item['quantity']
+            ).update(stock=F('stock') - item['quantity'])
+
+            if not updated:
+                raise InsufficientStockError(item['product'])
+
+        # Selling out changes the in-stock facet counts
+        sold_out = set(
+            Product.objects.filter(
+                id__in=[item['product'].id for item in cart_items],
+                stock__lte=MIN_STOCK
+            ).values_list('category_id', flat=True)
+        )
+        if sold_out:
+            bump_catalog_version(sold_out)
+
+        product_cache.invalidate(item['product'].id for item in cart_items)
@@ -0,0 +1,198 @@
+"""
+Catalog facet service.
+Parses facet filters (category, price range, in stock) from the query
+string and counts products per facet value.
+"""
+import hashlib
+from django.core.cache import cache
+from django.db.models import BooleanField, Case, CharField, Count, Q, Value, When
+from django.utils.http import urlencode
+from ..constants import FACET_CACHE_TIMEOUT, MIN_STOCK, PRICE_RANGES
+from .catalog_cache import get_catalog_version
+from .category_registry import category_registry
+
+# Query parameters of the facets
+FACET_CATEGORY = 'category'
+FACET_PRICE = 'price'
+FACET_IN_STOCK = 'in_stock'
+
+PRICE_RANGE_VALUES = [value for value, _, _, _ in PRICE_RANGES]
+
+
+def _price_q(low, high) -> Q:
+    condition = Q()
+    if low is not None:
+        condition &= Q(price__gte=low)
+    if high is not None:
+        condition &= Q(price__lt=high)
+    return condition
+
+
+IN_STOCK_Q = Q(stock__gt=MIN_STOCK)
+
+
+class ProductFilters:
+    """
+    Facet selection of a product list request.
+
+    Values inside a facet are OR-ed, facets are AND-ed, ex:
+    ``?category=phones&category=tablets&price=0-25&in_stock=1``.
+
+    Attributes:
+        category_ids (list): Selected category ids
+        prices (list): Selected price range values (see PRICE_RANGES)
+        in_stock (bool): Only products with stock
+        search (str): Search string (not a facet, but narrows the counts)
+    """
+
+    def __init__(self, category_ids=(), prices=(), in_stock=False, search=''):
+        self.category_ids = sorted(category_ids)
+        self.prices = [value for value in PRICE_RANGE_VALUES if value in prices]
+        self.in_stock = in_stock
+        self.search = search
+
+    @classmethod
+    def from_params(cls, params):
+        """
+        Read filters from a QueryDict; unknown values are ignored.
+
+        Args:
+            params: QueryDict (usually ``request.GET``)
+        """
+        categories = [
+            category_registry.get_by_slug(slug)
+            for slug in set(params.getlist(FACET_CATEGORY))
+        ]
+        return cls(
+            category_ids=[category.id for category in categories if category is not None],
+            prices=set(params.getlist(FACET_PRICE)),
+            in_stock=params.get(FACET_IN_STOCK) in ('1', 'true', 'on'),
+            search=params.get('search', '').strip()
+        )
+
+    @property
+    def is_active(self) -> bool:
+        return bool(self.category_ids or self.prices or self.in_stock)
+
+    def apply(self, queryset):
+        """Filter a Product queryset by the selected facet values."""
+        if self.category_ids:
+            queryset = queryset.filter(category_id__in=self.category_ids)
+        if self.prices:
+            condition = Q()
+            for value, _, low, high in PRICE_RANGES:
+                if value in self.prices:
+                    condition |= _price_q(low, high)
+            queryset = queryset.filter(condition)
+        if self.in_stock:
+            queryset = queryset.filter(IN_STOCK_Q)
+        return queryset
+
+    def matches(self, category_id, price_range, in_stock, ignore=None) -> bool:
+        """Whether a facet cell passes the filters (except facet ``ignore``)."""
+        return (
+            (ignore == FACET_CATEGORY or not self.category_ids or category_id in self.category_ids)
+            and (ignore == FACET_PRICE or not self.prices or price_range in self.prices)
+            and (ignore == FACET_IN_STOCK or not self.in_stock or in_stock)
+        )
+
+
+def _facet_cells(queryset, search: str) -> list:
+    """
+    Count products per (category, price range, in stock) cell.
+
+    One grouped query over the unfiltered list; every facet count is
+    then a sum of cells, so the result serves any facet selection and
+    is cached per (search, catalog version).
+    """
+    digest = hashlib.md5(search.lower().encode()).hexdigest()
+    key = f"catalog_facets:{get_catalog_version()}:{digest}"
+    cells = cache.get(key)
+    if cells is None:
+        price_range = Case(
+            *[When(_price_q(low, high), then=Value(value)) for value, _, low, high in PRICE_RANGES],
+            default=Value(''),
+            output_field=CharField()
+        )
+        in_stock = Case(When(IN_STOCK_Q, then=Value(True)), default=Value(False), output_field=BooleanField())
+        cells = list(
+            queryset.order_by()
+            .annotate(facet_price=price_range, facet_in_stock=in_stock)
+            .values('category_id', 'facet_price', 'facet_in_stock')
+            .annotate(count=Count('pk'))
+            .values_list('category_id', 'facet_price', 'facet_in_stock', 'count')
+        )
+        cache.set(key, cells, FACET_CACHE_TIMEOUT)
+    return cells
+
+
+def _toggle_query(params, name, value) -> str:
+    """Query string with ``name=value`` switched on or off (page reset)."""
+    query = [
+        (key, item) for key, items in params.lists()
+        if key not in ('page', 'after', 'before')
+        for item in items
+        if not (key == name and item == value)
+    ]
+    if value not in params.getlist(name):
+        query.append((name, value))
+    return f"?{urlencode(query)}"
+
+
+def get_facets(queryset, filters: ProductFilters, categories, params) -> dict:
+    """
+    Build facet values with counts for the product list.
+
+    A value's count is the number of products it would give combined
+    with the other facets' selection, so selecting a category still
+    shows the counts of the sibling categories.
+
+    Args:
+        queryset: Products before facet filters (availability, search)
+        filters: Current facet selection
+        categories: Categories shown in the category facet
+        params: QueryDict used to build the toggle links
+
+    Returns:
+        dict: ``categories``/``prices`` lists and ``in_stock`` entry, each
+            with label, count, selected and query; ``total`` matching products
+    """
+    category_counts, price_counts, in_stock_count, total = {}, {}, 0, 0
+    for category_id, price_range, in_stock, count in _facet_cells(queryset, filters.search):
+        if filters.matches(category_id, price_range, in_stock, ignore=FACET_CATEGORY):
+            category_counts[category_id] = category_counts.get(category_id, 0) + count
+        if filters.matches(category_id, price_range, in_stock, ignore=FACET_PRICE):
+            price_counts[price_range] = price_counts.get(price_range, 0) + count
+        if in_stock and filters.matches(category_id, price_range, in_stock, ignore=FACET_IN_STOCK):
+            in_stock_count += count
+        if filters.matches(category_id, price_range, in_stock):
+            total += count
+
+    return {
+        'categories': [
+            {
+                'value': category.slug,
+                'label': category.name,
+                'count': category_counts.get(category.id, 0),
+                'selected': category.id in filters.category_ids,
+                'query': _toggle_query(params, FACET_CATEGORY, category.slug),
+            }
+            for category in categories
+        ],
+        'prices': [
+            {
+                'value': value,
+                'label': label,
+                'count': price_counts.get(value, 0),
+                'selected': value in filters.prices,
+                'query': _toggle_query(params, FACET_PRICE, value),
+            }
+            for value, label, _, _ in PRICE_RANGES
+        ],
+        'in_stock': {
+            'count': in_stock_count,
+            'selected': filters.in_stock,
+            'query': _toggle_query(params, FACET_IN_STOCK, '1'),
+        },
+        'total': total,
+    }
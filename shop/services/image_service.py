@@ -0,0 +1,246 @@
+"""
+Product image derivatives.
+Uploaded images are resized to the sizes of PRODUCT_IMAGE_SIZES and
+encoded in every format of PRODUCT_IMAGE_FORMATS. Derivatives are named
+by the content hash of their source, so identical uploads share files
+and a derivative URL never changes content (safe to cache forever).
+
+Images are never resized on the request thread: until the derivatives
+of a source exist, the template tags return its original URL and queue
+the build in a small process pool. Once built, the source's hash is
+cached and image fragments re-render (``images_version``).
+``manage.py generate_image_derivatives`` builds everything ahead of time.
+
+Files are read and written through ``default_storage``, and a
+derivative URL is only handed out after all derivatives of its source
+were saved, so pages never point at a file still being written.
+"""
+import hashlib
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from functools import partial
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+from ..constants import (
+    PRODUCT_IMAGE_DERIVATIVE_PATH,
+    PRODUCT_IMAGE_FORMATS,
+    PRODUCT_IMAGE_LAZY_WORKERS,
+    PRODUCT_IMAGE_QUALITY,
+    PRODUCT_IMAGE_RETRY_TIMEOUT,
+    PRODUCT_IMAGE_SIZES,
+    PRODUCT_IMAGE_UPLOAD_PATH,
+    PRODUCT_IMAGE_WORKERS,
+)
+from .catalog_cache import bump_images_version
+
+logger = logging.getLogger(__name__)
+
+# Extensions of the source images picked up by the backfill
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff')
+
+# Errors of a source that cannot be turned into derivatives
+BUILD_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+# Largest first: each size is resized from the previous one
+_SIZES = sorted(PRODUCT_IMAGE_SIZES.items(), key=lambda item: -item[1][0] * item[1][1])
+
+
+def derivative_name(digest: str, size: str, image_format: str) -> str:
+    """Storage name of a derivative (``products/derivatives/ab/abcd...-card.webp``)."""
+    extension = PRODUCT_IMAGE_FORMATS[image_format]
+    return f"{PRODUCT_IMAGE_DERIVATIVE_PATH}{digest[:2]}/{digest}-{size}.{extension}"
+
+
+def _encode(image, image_format: str) -> bytes:
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A') if image.mode == 'RGBA' else None)
+        image = background
+
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, quality=PRODUCT_IMAGE_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def _save(name: str, data: bytes):
+    """Store a derivative under exactly ``name``."""
+    saved = default_storage.save(name, ContentFile(data))
+    if saved != name:
+        # Another worker saved the same content first: keep theirs
+        default_storage.delete(saved)
+
+
+def build_derivatives(source_name: str):
+    """
+    Save the missing derivatives of one source image.
+
+    Runs in worker processes: it only uses the storage, not the database.
+
+    Args:
+        source_name: Storage name of the source (``Product.image.name``)
+
+    Returns:
+        tuple: ``(source_name, digest, derivatives written)``
+    """
+    with default_storage.open(source_name, 'rb') as source:
+        data = source.read()
+    digest = hashlib.sha256(data).hexdigest()[:32]
+
+    missing = [
+        (size, box, image_format)
+        for size, box in _SIZES
+        for image_format in PRODUCT_IMAGE_FORMATS
+        if not default_storage.exists(derivative_name(digest, size, image_format))
+    ]
+    if not missing:
+        return source_name, digest, 0
+
+    image = Image.open(io.BytesIO(data))
+    # JPEG sources are decoded at a reduced scale when large enough
+    image.draft('RGB', _SIZES[0][1])
+    image = ImageOps.exif_transpose(image)
+    image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    for size, box, image_format in missing:
+        if image.width > box[0] or image.height > box[1]:
+            image = image.copy()
+            image.thumbnail(box, Image.Resampling.LANCZOS)
+        _save(derivative_name(digest, size, image_format), _encode(image, image_format))
+    return source_name, digest, len(missing)
+
+
+class ProductImageService:
+    """
+    URLs of product image derivatives.
+
+    The content hash of each source is cached under its name (uploads
+    get unique names, so the entry never goes stale): once a source is
+    built, a derivative URL costs one cache lookup and no file access.
+    A source that failed to build is cached as '' and retried after
+    PRODUCT_IMAGE_RETRY_TIMEOUT.
+    """
+
+    def __init__(self, workers: int = PRODUCT_IMAGE_LAZY_WORKERS):
+        """Initialize service with the size of the on-demand build pool."""
+        self.workers = workers
+        self._executor = None
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(source_name) -> str:
+        return f"product_image:{source_name}"
+
+    def url(self, image, size: str, image_format: str = 'JPEG') -> str:
+        """
+        Get the URL of a derivative, queuing its build on first use.
+
+        Args:
+            image: Product.image field file
+            size: Key of PRODUCT_IMAGE_SIZES
+            image_format: Key of PRODUCT_IMAGE_FORMATS
+
+        Returns:
+            str: Derivative URL; the original URL while derivatives are
+                missing, '' without image
+        """
+        if not image:
+            return ''
+
+        digest = cache.get(self._key(image.name))
+        if not digest:
+            if digest is None:
+                self.queue(image.name)
+            return image.url
+        return default_storage.url(derivative_name(digest, size, image_format))
+
+    def queue(self, source_name: str):
+        """Build the derivatives of a source in the background (once at a time)."""
+        with self._lock:
+            if source_name in self._pending:
+                return
+            if self._executor is None:
+                # Spawned workers: forking a threaded web server is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            try:
+                future = self._executor.submit(build_derivatives, source_name)
+            except BrokenExecutor:
+                self._executor = None
+                return
+            self._pending.add(source_name)
+        future.add_done_callback(partial(self._built, source_name))
+
+    def _built(self, source_name: str, future):
+        with self._lock:
+            self._pending.discard(source_name)
+        try:
+            _, digest, _ = future.result()
+        except BrokenExecutor:
+            with self._lock:
+                self._executor = None
+            return
+        except BUILD_ERRORS as e:
+            logger.warning("Cannot build derivatives of %s: %s", source_name, e)
+            cache.set(self._key(source_name), '', PRODUCT_IMAGE_RETRY_TIMEOUT)
+            return
+        cache.set(self._key(source_name), digest, None)
+        bump_images_version()
+
+    def sources(self, directory: str = None):
+        """Names of the product images in the storage (derivatives excluded)."""
+        if directory is None:
+            directory = PRODUCT_IMAGE_UPLOAD_PATH.split('%')[0].rstrip('/')
+        if f"{directory}/" == PRODUCT_IMAGE_DERIVATIVE_PATH:
+            return
+        subdirectories, files = default_storage.listdir(directory)
+        for subdirectory in sorted(subdirectories):
+            yield from self.sources(f"{directory}/{subdirectory}")
+        for file_name in sorted(files):
+            if file_name.lower().endswith(SOURCE_EXTENSIONS):
+                yield f"{directory}/{file_name}"
+
+    def backfill(self, workers: int = PRODUCT_IMAGE_WORKERS, on_result=None) -> dict:
+        """
+        Build the missing derivatives of every product image.
+
+        Sources are decoded and encoded in a process pool (image work is
+        CPU-bound); their hashes are cached so pages link the derivatives
+        right away.
+
+        Args:
+            workers: Worker processes (None: one per CPU)
+            on_result: Called with ``(source_name, written)`` per source
+
+        Returns:
+            dict: ``sources`` processed, ``written`` derivatives, ``failed`` sources
+        """
+        stats = {'sources': 0, 'written': 0, 'failed': 0}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {name: pool.submit(build_derivatives, name) for name in self.sources()}
+            for name, future in futures.items():
+                try:
+                    _, digest, written = future.result()
+                except BUILD_ERRORS as e:
+                    logger.warning("Cannot build derivatives of %s: %s", name, e)
+                    stats['failed'] += 1
+                    continue
+                cache.set(self._key(name), digest, None)
+                stats['sources'] += 1
+                stats['written'] += written
+                if on_result is not None:
+                    on_result(name, written)
+        if stats['sources']:
+            bump_images_version()
+        return stats
+
+
+# Process-wide service used by the template tags and the backfill command
+product_images = ProductImageService()
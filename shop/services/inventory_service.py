@@ -0,0 +1,185 @@
+"""
+Inventory ledger service.
+Every stock change is appended to StockMovement (bulk inserts) next to
+an atomic ``stock = stock + q`` UPDATE of the materialized balance,
+``Product.stock``. Old movements are periodically compacted into one
+StockSnapshot per product, so rebuilding a balance reads one snapshot
+and the recent movements only.
+"""
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from ..constants import (
+    STOCK_COMPACTION_BATCH,
+    STOCK_MOVEMENT_ADJUSTMENT,
+    STOCK_MOVEMENT_SALE,
+)
+from ..models import Product, StockMovement, StockSnapshot
+from .product_cache import product_cache
+from .reservation_service import InsufficientStockError
+
+
+class InventoryLedger:
+    """
+    Stock movements, balances and ledger compaction.
+
+    Callers that already changed ``Product.stock`` with a guarded UPDATE
+    (checkout, order cancellation) only ``record`` their movements;
+    ``adjust`` does both for single changes (restock, admin edits).
+    """
+
+    def record(self, movements):
+        """
+        Append movements to the ledger (one bulk INSERT).
+
+        Args:
+            movements: Unsaved StockMovement instances
+        """
+        StockMovement.objects.bulk_create(movements, batch_size=STOCK_COMPACTION_BATCH)
+
+    def record_sales(self, order, cart_items):
+        """Record the stock decrement of a placed order."""
+        self.record([
+            StockMovement(
+                product_id=item['product'].id,
+                kind=STOCK_MOVEMENT_SALE,
+                quantity=-item['quantity'],
+                order=order
+            )
+            for item in cart_items
+        ])
+
+    def adjust(self, product_id, quantity: int, kind: str = STOCK_MOVEMENT_ADJUSTMENT,
+               note: str = '', order=None):
+        """
+        Change a product's stock by ``quantity`` and record the movement.
+
+        The balance is updated with ``stock = stock + quantity`` (never
+        an absolute value), so concurrent sales are not overwritten.
+
+        Raises:
+            InsufficientStockError: If a decrease exceeds the current stock
+        """
+        with transaction.atomic():
+            products = Product.objects.filter(pk=product_id)
+            if quantity < 0:
+                products = products.filter(stock__gte=-quantity)
+            if not products.update(stock=F('stock') + quantity):
+                raise InsufficientStockError(Product.objects.get(pk=product_id))
+            self.record([
+                StockMovement(product_id=product_id, kind=kind, quantity=quantity, order=order, note=note)
+            ])
+        product_cache.invalidate([product_id])
+
+    def balances(self, product_ids) -> dict:
+        """
+        Rebuild balances from the ledger (snapshot + later movements).
+
+        Returns:
+            dict: ``{product_id: quantity}`` (0 for products without history)
+        """
+        product_ids = list(product_ids)
+        balances = dict.fromkeys(product_ids, 0)
+        balances.update(
+            StockSnapshot.objects.filter(product_id__in=product_ids).values_list('product_id', 'quantity')
+        )
+        for product_id, total in (
+            StockMovement.objects.filter(product_id__in=product_ids)
+            .order_by()
+            .values('product_id')
+            .annotate(total=Sum('quantity'))
+            .values_list('product_id', 'total')
+        ):
+            balances[product_id] += total
+        return balances
+
+    def drift(self, product_ids=None) -> dict:
+        """
+        Products whose stock differs from their ledger balance.
+
+        Compared in one query (snapshot joined, movements summed in a
+        subquery), so the whole catalog is never loaded in memory.
+
+        Returns:
+            dict: ``{product_id: (stock, ledger balance)}``
+        """
+        products = Product.objects.all() if product_ids is None else Product.objects.filter(pk__in=product_ids)
+        movements = (
+            StockMovement.objects.filter(product_id=OuterRef('pk'))
+            .order_by()
+            .values('product_id')
+            .annotate(total=Sum('quantity'))
+            .values('total')
+        )
+        balance = (
+            Coalesce(F('stock_snapshot__quantity'), 0)
+            + Coalesce(Subquery(movements, output_field=IntegerField()), 0)
+        )
+        return {
+            product_id: (stock, ledger_balance)
+            for product_id, stock, ledger_balance in (
+                products.annotate(ledger_balance=balance)
+                .exclude(stock=F('ledger_balance'))
+                .order_by()
+                .values_list('pk', 'stock', 'ledger_balance')
+                .iterator()
+            )
+        }
+
+    def compact(self, before, batch_size: int = STOCK_COMPACTION_BATCH) -> dict:
+        """
+        Roll movements created before ``before`` into snapshots.
+
+        Each batch of products is one transaction: their old movements
+        are summed into the snapshots and deleted. Only movements up to
+        the last id seen when the job started are touched, so rows
+        inserted meanwhile are left for the next run.
+
+        Returns:
+            dict: ``products`` compacted, ``movements`` rolled into snapshots
+        """
+        stats = {'products': 0, 'movements': 0}
+        old = StockMovement.objects.filter(created_at__lt=before)
+        last_id = old.aggregate(last=Max('pk'))['last']
+        if last_id is None:
+            return stats
+        old = old.filter(pk__lte=last_id)
+
+        product_ids = list(old.order_by('product_id').values_list('product_id', flat=True).distinct())
+        for start in range(0, len(product_ids), batch_size):
+            batch = product_ids[start:start + batch_size]
+            with transaction.atomic():
+                movements = old.filter(product_id__in=batch)
+                totals = (
+                    movements.order_by()
+                    .values('product_id')
+                    .annotate(total=Sum('quantity'), count=Count('pk'))
+                    .values_list('product_id', 'total', 'count')
+                )
+                snapshots = StockSnapshot.objects.select_for_update().in_bulk(batch, field_name='product_id')
+                now = timezone.now()
+
+                rolled = []
+                for product_id, total, count in totals:
+                    snapshot = snapshots.get(product_id) or StockSnapshot(product_id=product_id, as_of=before)
+                    snapshot.quantity += total
+                    snapshot.movements += count
+                    snapshot.as_of = max(snapshot.as_of, before)
+                    snapshot.updated_at = now
+                    rolled.append(snapshot)
+                    stats['movements'] += count
+
+                StockSnapshot.objects.bulk_create(
+                    rolled,
+                    update_conflicts=True,
+                    unique_fields=['product'],
+                    update_fields=['quantity', 'movements', 'as_of', 'updated_at']
+                )
+                movements.delete()
+            stats['products'] += len(batch)
+        return stats
+
+
+# Process-wide ledger used by checkout, orders, admin and the compaction command
+inventory_ledger = InventoryLedger()
@@ -0,0 +1,26 @@
+"""
+Per-user order count cache.
+Order history headers read the count from the cache instead of COUNT(*).
+"""
+from django.core.cache import cache
+from ..constants import USER_ORDER_COUNT_CACHE_TIMEOUT
+from ..models import Order
+
+
+def _key(user_id) -> str:
+    return f"user_order_count:{user_id}"
+
+
+def get_user_order_count(user) -> int:
+    """Get the number of orders of a user (cached, one COUNT on miss)."""
+    count = cache.get(_key(user.pk))
+    if count is None:
+        count = Order.objects.filter(user=user).count()
+        cache.set(_key(user.pk), count, USER_ORDER_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def invalidate_user_order_count(user_id):
+    """Drop the cached count after orders of a user were added or deleted."""
+    if user_id is not None:
+        cache.delete(_key(user_id))
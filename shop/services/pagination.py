@@ -0,0 +1,194 @@
+"""
+Pagination without OFFSET/COUNT costs.
+
+- Keyset (cursor) pagination: pages are fetched with ``WHERE key1 < v1
+  OR (key1 = v1 AND key2 < v2) ORDER BY key1, key2 LIMIT n + 1`` (the
+  last values of the previous page) instead of OFFSET, and no COUNT is
+  run, so every page costs the same index range scan however deep it is.
+- Known count: numbered pages whose total is given by the caller (ex:
+  the cached facet total) instead of ``COUNT(*)``.
+"""
+import base64
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.http import urlencode
+
+# Query parameters carrying the cursors
+CURSOR_AFTER_PARAM = 'after'
+CURSOR_BEFORE_PARAM = 'before'
+
+# Pagination modes (PRODUCT_LIST_PAGINATION setting)
+PAGINATION_OFFSET = 'offset'
+PAGINATION_ESTIMATED = 'estimated'
+PAGINATION_KEYSET = 'keyset'
+
+
+class KeysetPage:
+    """
+    One page of a KeysetPaginator.
+
+    Attributes:
+        object_list (list): Objects of the page
+        has_next (bool): Whether a next page exists
+        has_previous (bool): Whether a previous page exists
+        next_query (str): Query string of the next page ("?...after=...")
+        previous_query (str): Query string of the previous page
+        first_query (str): Query string of the first page
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor, params):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.next_query = self._query(params, CURSOR_AFTER_PARAM, next_cursor)
+        self.previous_query = self._query(params, CURSOR_BEFORE_PARAM, previous_cursor)
+        self.first_query = self._query(params, None, None)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    @staticmethod
+    def _query(params, name, cursor) -> str:
+        """Keep the other query parameters (filters, search) in page links."""
+        query = [
+            (key, value) for key, values in params.lists()
+            if key not in (CURSOR_AFTER_PARAM, CURSOR_BEFORE_PARAM, 'page')
+            for value in values
+        ]
+        if name is not None:
+            query.append((name, cursor))
+        return f"?{urlencode(query)}"
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset on a unique ordering, ex: ``('-created_at', '-pk')``.
+
+    The last key must be unique (usually the primary key) so that the
+    cursor identifies one row. An invalid cursor gives the first page.
+    """
+
+    def __init__(self, queryset, per_page: int, keys=('-created_at', '-pk')):
+        """Initialize paginator for a queryset and its ordering keys."""
+        self.queryset = queryset
+        self.per_page = per_page
+        self.keys = keys
+        self.fields = [key.lstrip('-') for key in keys]
+
+    def get_page(self, params) -> KeysetPage:
+        """
+        Get the page selected by the cursor parameters.
+
+        Args:
+            params: QueryDict (usually ``request.GET``)
+        """
+        after = self._decode(params.get(CURSOR_AFTER_PARAM))
+        before = self._decode(params.get(CURSOR_BEFORE_PARAM)) if after is None else None
+
+        if before is not None:
+            # Walk backwards from the cursor, then restore display order
+            rows = list(
+                self.queryset.filter(self._seek(before, reverse=True))
+                .order_by(*self._ordering(reverse=True))[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            object_list = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            queryset = self.queryset
+            if after is not None:
+                queryset = queryset.filter(self._seek(after))
+            rows = list(queryset.order_by(*self._ordering())[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            object_list = rows[:self.per_page]
+            has_previous = after is not None
+
+        return KeysetPage(
+            object_list,
+            has_next=has_next and bool(object_list),
+            has_previous=has_previous and bool(object_list),
+            next_cursor=self._encode(object_list[-1]) if object_list else None,
+            previous_cursor=self._encode(object_list[0]) if object_list else None,
+            params=params
+        )
+
+    def _ordering(self, reverse=False):
+        if not reverse:
+            return self.keys
+        return [key[1:] if key.startswith('-') else f'-{key}' for key in self.keys]
+
+    def _seek(self, values, reverse=False) -> Q:
+        """
+        Rows after the cursor in the (possibly reversed) ordering.
+
+        The row-value comparison ``(k1, k2) < (v1, v2)`` is written out
+        as ``k1 < v1 OR (k1 = v1 AND k2 < v2)``, which also covers keys
+        sorted in different directions; the ``k1`` range still uses the
+        index of the ordering.
+        """
+        condition = Q()
+        for index, key in enumerate(self.keys):
+            descending = key.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            term = Q(**{f'{self.fields[index]}__{lookup}': values[index]})
+            for field, value in zip(self.fields[:index], values[:index]):
+                term &= Q(**{field: value})
+            condition |= term
+        return condition
+
+    def _encode(self, obj) -> str:
+        values = []
+        for field in self.fields:
+            value = getattr(obj, field)
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            elif not isinstance(value, (int, float, str)):
+                value = str(value)  # Decimal
+            values.append(value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+    def _decode(self, cursor):
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                return None
+            model = self.queryset.model
+            return [
+                model._meta.pk.to_python(value) if field == 'pk'
+                else model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (ValueError, TypeError, ValidationError, FieldDoesNotExist):
+            return None
+
+
+class KnownCountPaginator(Paginator):
+    """
+    Numbered paginator that never runs ``COUNT(*)``.
+
+    The count is given by the caller (ex: the cached facet total). Pages
+    stay OFFSET based, so keyset pagination is still preferable for deep
+    pages.
+    """
+
+    def __init__(self, object_list, per_page, count: int, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.known_count = count
+
+    @property
+    def count(self):
+        return self.known_count
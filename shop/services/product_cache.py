@@ -0,0 +1,113 @@
+"""
+Product read-through cache.
+Products are looked up by id or slug in the cache and loaded from the
+database on a miss; a request also keeps the products it already
+fetched, so each product is fetched at most once per request.
+
+Keys hold the product id only, so a change drops the products it
+touched and nothing else: saves and deletes through their signal
+receivers, bulk writes in ProductQuerySet, category changes for the
+products of the category. Stock-only writes (checkout, restock) drop
+their products explicitly.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from ..constants import PRODUCT_CACHE_TIMEOUT
+from ..models import Product
+
+# Request attribute holding the products fetched during the request
+PRODUCT_CACHE_REQUEST_ATTR = '_product_cache'
+
+
+class ProductCache:
+    """
+    Product lookups by id and slug (category loaded with the product).
+
+    Cached products are model instances: callers read them, and write
+    through the ORM (a ``save()`` invalidates the cache).
+    """
+
+    @staticmethod
+    def _key(product_id) -> str:
+        return f"product:{product_id}"
+
+    @staticmethod
+    def _slug_key(slug) -> str:
+        # Points to an id: checked against the product's slug on use
+        return f"product_slug:{slug}"
+
+    @staticmethod
+    def _memo(request) -> dict:
+        if request is None:
+            return {}
+        memo = getattr(request, PRODUCT_CACHE_REQUEST_ATTR, None)
+        if memo is None:
+            memo = {}
+            setattr(request, PRODUCT_CACHE_REQUEST_ATTR, memo)
+        return memo
+
+    def get_many(self, product_ids, request=None) -> dict:
+        """
+        Get products by id: request memo, then cache, then one query.
+
+        Args:
+            product_ids: Product ids (ints or numeric strings)
+            request: Request memoizing the products (optional)
+
+        Returns:
+            dict: ``{product_id: Product}`` (missing products omitted)
+        """
+        memo = self._memo(request)
+        ids = {int(product_id) for product_id in product_ids}
+        products = {product_id: memo[product_id] for product_id in ids if product_id in memo}
+        missing = ids - products.keys()
+
+        if missing:
+            for product in cache.get_many([self._key(product_id) for product_id in missing]).values():
+                products[product.pk] = product
+            missing -= products.keys()
+
+            if missing:
+                loaded = Product.objects.select_related('category').in_bulk(missing)
+                cache.set_many(
+                    {self._key(product_id): product for product_id, product in loaded.items()},
+                    PRODUCT_CACHE_TIMEOUT
+                )
+                products.update(loaded)
+            memo.update(products)
+
+        return products
+
+    def get(self, product_id, request=None):
+        """Get a product by id (None if it does not exist)."""
+        return self.get_many([product_id], request).get(int(product_id))
+
+    def get_by_slug(self, slug: str, request=None):
+        """Get a product by slug (None if it does not exist)."""
+        product_id = cache.get(self._slug_key(slug))
+        if product_id is not None:
+            product = self.get(product_id, request)
+            if product is not None and product.slug == slug:
+                return product
+
+        product = Product.objects.select_related('category').filter(slug=slug).first()
+        if product is not None:
+            cache.set_many(
+                {
+                    self._key(product.pk): product,
+                    self._slug_key(slug): product.pk,
+                },
+                PRODUCT_CACHE_TIMEOUT
+            )
+            self._memo(request)[product.pk] = product
+        return product
+
+    def invalidate(self, product_ids):
+        """Drop products from the cache once the current transaction commits."""
+        keys = [self._key(product_id) for product_id in product_ids]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# Process-wide cache used by views, cart and checkout
+product_cache = ProductCache()
@@ -0,0 +1,208 @@
+"""
+Co-purchase recommendation service.
+Mines OrderItem history for products bought in the same order and
+stores the top-K neighbours of every product.
+
+Counting is vectorized with NumPy: pairs are generated and counted as
+int64 arrays.
+"""
+from collections import Counter
+import numpy as np
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+from ..constants import (
+    ORDER_STATUS_CANCELLED,
+    RECOMMENDATION_MAX_ORDER_PRODUCTS,
+    RECOMMENDATION_ORDER_BATCH,
+    RECOMMENDATIONS_SEQUENCE,
+    RECOMMENDATIONS_SHOWN,
+    RECOMMENDATIONS_TOP_K,
+)
+from ..models import Order, OrderItem, Product, ProductRecommendation, Sequence
+from .catalog_cache import bump_recommendations_version
+
+
+def _concat_ranges(starts, sizes):
+    """``[s0, s0+1, ..., s0+z0-1, s1, ...]`` for arrays of starts and sizes."""
+    offsets = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return np.repeat(starts, sizes) + (np.arange(int(sizes.sum())) - offsets)
+
+
+def count_co_purchases(order_ids, product_ids,
+                       max_products: int = RECOMMENDATION_MAX_ORDER_PRODUCTS) -> dict:
+    """
+    Count orders containing each ordered pair of distinct products.
+
+    Args:
+        order_ids: Order id of each row, rows grouped by order
+        product_ids: Product id of each row (distinct within an order)
+        max_products: Orders with more products are skipped
+
+    Returns:
+        dict: ``{(product_id, other_product_id): orders}`` (both directions)
+    """
+    if not len(order_ids):
+        return {}
+    orders = np.asarray(order_ids, dtype=np.int64)
+    products = np.asarray(product_ids, dtype=np.int64)
+
+    # Rows are sorted by order: one group of rows per order
+    starts = np.flatnonzero(np.r_[True, orders[1:] != orders[:-1]])
+    sizes = np.diff(np.r_[starts, len(orders)])
+    keep = (sizes > 1) & (sizes <= max_products)
+    starts, sizes = starts[keep], sizes[keep]
+    if not len(starts):
+        return {}
+
+    # Every row of a group is paired with every row of the same group
+    rows = _concat_ranges(starts, sizes)
+    row_starts = np.repeat(starts, sizes)
+    row_sizes = np.repeat(sizes, sizes)
+    left = products[np.repeat(rows, row_sizes)]
+    right = products[_concat_ranges(row_starts, row_sizes)]
+    distinct = left != right
+    left, right = left[distinct], right[distinct]
+
+    # Encode (a, b) as one int64 and count with a single sort
+    base = int(products.max()) + 1
+    codes, counts = np.unique(left * base + right, return_counts=True)
+    return {
+        (int(code // base), int(code % base)): int(count)
+        for code, count in zip(codes, counts)
+    }
+
+
+class RecommendationService:
+    """
+    Batch job and lookups for "customers also bought" recommendations.
+
+    A refresh mines only the orders not mined yet (flagged with
+    ``Order.recommendations_mined``, so an order committed after a
+    higher id was mined is still picked up) and merges their pair
+    counts into the stored top-K lists of the products they contain.
+    Pairs that were below a product's top K are not stored, so a full
+    rebuild (``full=True``) recounts them exactly.
+    """
+
+    def __init__(self, top_k: int = RECOMMENDATIONS_TOP_K,
+                 batch_size: int = RECOMMENDATION_ORDER_BATCH):
+        """Initialize service with the stored list size and mining batch."""
+        self.top_k = top_k
+        self.batch_size = batch_size
+
+    def refresh(self, full: bool = False) -> dict:
+        """
+        Mine new orders and update the stored recommendations.
+
+        Args:
+            full: Drop every recommendation and mine all orders
+
+        Returns:
+            dict: ``orders`` mined, ``pairs`` counted,
+                ``products`` whose recommendations were rewritten
+        """
+        with transaction.atomic():
+            # Locked for the whole refresh: concurrent runs would mine the same orders
+            Sequence.objects.select_for_update().get_or_create(name=RECOMMENDATIONS_SEQUENCE)
+            orders = Order.objects.all() if full else Order.objects.filter(recommendations_mined=False)
+
+            counts = Counter()
+            mined = last_id = 0
+            while True:
+                order_ids = list(
+                    orders.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:self.batch_size]
+                )
+                if not order_ids:
+                    break
+                counts.update(self._mine(order_ids))
+                # Only the orders read above: one committed meanwhile stays unmined
+                Order.objects.filter(pk__in=order_ids).update(recommendations_mined=True)
+                mined += len(order_ids)
+                last_id = order_ids[-1]
+
+            if full:
+                ProductRecommendation.objects.all().delete()
+            products = self._merge(counts)
+            bump_recommendations_version()
+
+        return {
+            'orders': mined,
+            'pairs': len(counts),
+            'products': len(products),
+        }
+
+    def _mine(self, order_ids: list) -> dict:
+        """Count co-purchases of the given orders."""
+        rows = list(
+            OrderItem.objects.filter(order_id__in=order_ids)
+            .exclude(order__status=ORDER_STATUS_CANCELLED)
+            .order_by('order_id', 'product_id')
+            .values_list('order_id', 'product_id')
+            .distinct()
+        )
+        if not rows:
+            return {}
+        order_ids, product_ids = zip(*rows)
+        return count_co_purchases(order_ids, product_ids)
+
+    def _merge(self, counts: dict) -> set:
+        """Add pair counts to the stored lists of the products involved."""
+        scores = {}
+        for (product_id, other_id), count in counts.items():
+            scores.setdefault(product_id, Counter())[other_id] += count
+        if not scores:
+            return set()
+
+        stored = ProductRecommendation.objects.filter(product_id__in=scores)
+        for product_id, other_id, score in stored.values_list('product_id', 'recommended_id', 'score'):
+            scores[product_id][other_id] += score
+        stored.delete()
+
+        ProductRecommendation.objects.bulk_create(
+            [
+                ProductRecommendation(
+                    product_id=product_id,
+                    recommended_id=other_id,
+                    score=score,
+                    rank=rank
+                )
+                for product_id, neighbours in scores.items()
+                # Ties broken by product id so refreshes are deterministic
+                for rank, (other_id, score) in enumerate(
+                    sorted(neighbours.items(), key=lambda item: (-item[1], item[0]))[:self.top_k]
+                )
+            ],
+            batch_size=1000
+        )
+        return set(scores)
+
+    def for_product(self, product, limit: int = RECOMMENDATIONS_SHOWN) -> list:
+        """
+        Get products to show next to a product.
+
+        One indexed lookup on ``(product, rank)``; products without
+        enough co-purchases are completed from their category.
+        """
+        recommended = list(
+            Product.objects.filter(
+                recommended_by__product=product,
+                is_available=True
+            )
+            .select_related('category')
+            .order_by('recommended_by__rank')[:limit]
+        )
+        if len(recommended) < limit:
+            recommended += list(
+                Product.objects.filter(category_id=product.category_id, is_available=True)
+                .exclude(id__in=[product.id] + [other.id for other in recommended])
+                .select_related('category')[:limit - len(recommended)]
+            )
+        return recommended
+
+    def lazy_for_product(self, product, limit: int = RECOMMENDATIONS_SHOWN):
+        """``for_product`` evaluated on first use (skipped on fragment cache hits)."""
+        return SimpleLazyObject(lambda: self.for_product(product, limit))
+
+
+# Process-wide service used by the product page and the refresh command
+recommendations = RecommendationService()
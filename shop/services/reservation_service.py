@@ -0,0 +1,204 @@
+"""
+Stock reservation service.
+Holds stock for a cart during checkout and expires holds in bulk.
+"""
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from ..constants import STOCK_RESERVATION_TTL, STOCK_RESERVATION_SWEEP_BATCH
+from ..models import Product, StockReservation
+
+
+class InsufficientStockError(Exception):
+    """Raised when a cart line cannot be covered by current stock."""
+
+    def __init__(self, product):
+        self.product = product
+        super().__init__(f"Insufficient stock for {product.name}")
+
+
+class StockReservationService:
+    """
+    Time-limited stock holds on top of the StockReservation table.
+
+    Stock available to a cart is ``Product.stock`` minus the units held
+    by other carts whose hold has not expired. Every lookup goes through
+    the ``(product, expires_at)`` or ``(expires_at)`` index, so cost does
+    not grow with the number of active holds on other products.
+    """
+
+    @staticmethod
+    def get_holder(request, create: bool = True) -> str:
+        """
+        Identify the cart of a request.
+
+        Anonymous holds are keyed by session, which login rotates: holds
+        taken before login simply expire.
+
+        Args:
+            create: Save a new session to get a key; if False, None is
+                returned for sessions without one (they hold nothing)
+        """
+        if request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        if request.session.session_key is None:
+            if not create:
+                return None
+            request.session.save()
+        return f"session:{request.session.session_key}"
+
+    def held_quantities(self, product_ids, exclude_holder: str = None) -> dict:
+        """
+        Sum active holds per product in one grouped query.
+
+        Args:
+            product_ids: Products to look up
+            exclude_holder: Holder whose own holds are not counted
+
+        Returns:
+            dict: ``{product_id: units held}`` (products without holds omitted)
+        """
+        holds = StockReservation.objects.filter(
+            product_id__in=product_ids,
+            expires_at__gt=timezone.now()
+        )
+        if exclude_holder is not None:
+            holds = holds.exclude(holder=exclude_holder)
+
+        return dict(
+            holds.values('product_id')
+            .annotate(held=Sum('quantity'))
+            .values_list('product_id', 'held')
+        )
+
+    def held_by_others(self, holder: str):
+        """
+        Units of the outer query's product held by other carts.
+
+        A correlated subquery, so a guarded UPDATE can check stock and
+        holds in one statement without locking the product first.
+
+        Args:
+            holder: Holder whose own holds are not counted
+
+        Returns:
+            Expression: ``COALESCE((SELECT SUM(quantity) ...), 0)``
+        """
+        holds = StockReservation.objects.filter(
+            product_id=OuterRef('pk'),
+            expires_at__gt=timezone.now()
+        )
+        if holder is not None:
+            holds = holds.exclude(holder=holder)
+        held = holds.order_by().values('product_id').annotate(held=Sum('quantity')).values('held')
+        return Coalesce(Subquery(held, output_field=IntegerField()), 0)
+
+    def available_quantities(self, products, exclude_holder: str = None,
+                             fresh_stock: bool = False) -> dict:
+        """
+        Get stock not held by other carts.
+
+        Args:
+            products: Products to check
+            exclude_holder: Holder whose own holds are not subtracted
+            fresh_stock: Read stock from the database instead of the
+                instances (which may come from the product cache)
+
+        Returns:
+            dict: ``{product_id: available units}``
+        """
+        product_ids = [product.id for product in products]
+        if fresh_stock:
+            stock = dict(Product.objects.filter(pk__in=product_ids).values_list('pk', 'stock'))
+        else:
+            stock = {product.id: product.stock for product in products}
+        held = self.held_quantities(product_ids, exclude_holder)
+        return {
+            product_id: max(stock.get(product_id, 0) - held.get(product_id, 0), 0)
+            for product_id in product_ids
+        }
+
+    def reserve(self, holder: str, cart_items, ttl: int = STOCK_RESERVATION_TTL):
+        """
+        Hold stock for every cart line until ``now + ttl``.
+
+        Products are locked in id order while availability is checked,
+        so two carts can never hold the same last units. Holds of the
+        holder for products no longer in the cart are dropped.
+
+        Returns:
+            datetime: Expiry of the holds
+
+        Raises:
+            InsufficientStockError: If a line exceeds the available stock
+        """
+        quantities = {item['product'].id: item['quantity'] for item in cart_items}
+        expires_at = timezone.now() + timedelta(seconds=ttl)
+
+        with transaction.atomic():
+            products = list(
+                Product.objects.select_for_update()
+                .filter(id__in=quantities)
+                .order_by('id')
+            )
+            available = self.available_quantities(products, exclude_holder=holder)
+            for product in products:
+                if not product.is_available or available[product.id] < quantities[product.id]:
+                    raise InsufficientStockError(product)
+
+            StockReservation.objects.filter(holder=holder).exclude(
+                product_id__in=quantities
+            ).delete()
+
+            StockReservation.objects.bulk_create(
+                [
+                    StockReservation(
+                        holder=holder,
+                        product_id=product_id,
+                        quantity=quantity,
+                        expires_at=expires_at
+                    )
+                    for product_id, quantity in quantities.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['holder', 'product'],
+                update_fields=['quantity', 'expires_at']
+            )
+
+        return expires_at
+
+    def release(self, holder: str) -> int:
+        """
+        Drop every hold of a holder (ex: once stock was decremented).
+
+        Returns:
+            int: Number of holds deleted
+        """
+        deleted, _ = StockReservation.objects.filter(holder=holder).delete()
+        return deleted
+
+    def expire(self, batch_size: int = STOCK_RESERVATION_SWEEP_BATCH) -> int:
+        """
+        Delete expired holds in batches walked along the expiry index.
+
+        Returns:
+            int: Number of holds deleted
+        """
+        now = timezone.now()
+        total = 0
+        while True:
+            ids = list(
+                StockReservation.objects.filter(expires_at__lte=now)
+                .order_by('expires_at')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return total
+            deleted, _ = StockReservation.objects.filter(id__in=ids).delete()
+            total += deleted
+
+
+# Process-wide service used by cart and checkout
+stock_reservations = StockReservationService()
@@ -0,0 +1,232 @@
+"""
+Product search service.
+Full-text search over product name, description and category name.
+
+- SQLite: an FTS5 table ``shop_product_fts`` (rowid = product id) kept
+  in sync by triggers, so ``save()``, ``bulk_create()`` and
+  ``QuerySet.update()`` are all indexed. Only changes to name,
+  description or category touch it (not stock updates).
+- PostgreSQL: a ``search_document`` tsvector column (weighted name,
+  category, description) kept in sync by triggers, with a GIN index.
+- Other databases: ``icontains`` scans.
+
+Queries match every word, the last ones as prefixes ("iph pro" finds
+"iPhone 17 Pro"), and results are ordered by relevance. The index is
+joined into the caller's queryset, so its filters apply to every match.
+
+The migrations creating these objects keep their own copy of the DDL;
+the statements here are used by ``manage.py rebuild_search_index``.
+"""
+import re
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SQLITE_FTS_TABLE = 'shop_product_fts'
+POSTGRES_SEARCH_COLUMN = 'search_document'
+POSTGRES_SEARCH_INDEX = 'shop_product_search_document_idx'
+POSTGRES_SEARCH_CONFIG = 'simple'
+
+_SQLITE_CATEGORY_NAME = "(SELECT name FROM shop_category WHERE id = new.category_id)"
+
+SQLITE_CREATE_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        name, description, category,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON shop_product BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, {_SQLITE_CATEGORY_NAME});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON shop_product BEGIN
+        DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au
+    AFTER UPDATE OF name, description, category_id ON shop_product BEGIN
+        UPDATE {SQLITE_FTS_TABLE}
+        SET name = new.name, description = new.description, category = {_SQLITE_CATEGORY_NAME}
+        WHERE rowid = new.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_category_au
+    AFTER UPDATE OF name ON shop_category BEGIN
+        UPDATE {SQLITE_FTS_TABLE} SET category = new.name
+        WHERE rowid IN (SELECT id FROM shop_product WHERE category_id = new.id);
+    END""",
+]
+
+SQLITE_DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_category_au",
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ai",
+    f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}",
+]
+
+SQLITE_POPULATE_SQL = f"""
+    INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description, category)
+    SELECT p.id, p.name, p.description, c.name
+    FROM shop_product p JOIN shop_category c ON c.id = p.category_id
+"""
+
+# Weights A/B/C: name, category, description (same order as the FTS5 bm25 weights)
+POSTGRES_CREATE_SQL = [
+    f"ALTER TABLE shop_product ADD COLUMN IF NOT EXISTS {POSTGRES_SEARCH_COLUMN} tsvector",
+    f"""CREATE OR REPLACE FUNCTION shop_product_search_document() RETURNS trigger AS $$
+    BEGIN
+        NEW.{POSTGRES_SEARCH_COLUMN} :=
+            setweight(to_tsvector('{POSTGRES_SEARCH_CONFIG}', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('{POSTGRES_SEARCH_CONFIG}', coalesce(
+                (SELECT name FROM shop_category WHERE id = NEW.category_id), '')), 'B') ||
+            setweight(to_tsvector('{POSTGRES_SEARCH_CONFIG}', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS shop_product_search_document ON shop_product",
+    """CREATE TRIGGER shop_product_search_document
+    BEFORE INSERT OR UPDATE OF name, description, category_id ON shop_product
+    FOR EACH ROW EXECUTE FUNCTION shop_product_search_document()""",
+    """CREATE OR REPLACE FUNCTION shop_category_search_document() RETURNS trigger AS $$
+    BEGIN
+        UPDATE shop_product SET category_id = category_id WHERE category_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS shop_category_search_document ON shop_category",
+    """CREATE TRIGGER shop_category_search_document
+    AFTER UPDATE OF name ON shop_category
+    FOR EACH ROW EXECUTE FUNCTION shop_category_search_document()""",
+    f"CREATE INDEX IF NOT EXISTS {POSTGRES_SEARCH_INDEX} ON shop_product USING GIN ({POSTGRES_SEARCH_COLUMN})",
+]
+
+# Fires the product trigger on every row
+POSTGRES_POPULATE_SQL = "UPDATE shop_product SET category_id = category_id"
+
+POSTGRES_DROP_SQL = [
+    f"DROP INDEX IF EXISTS {POSTGRES_SEARCH_INDEX}",
+    "DROP TRIGGER IF EXISTS shop_category_search_document ON shop_category",
+    "DROP FUNCTION IF EXISTS shop_category_search_document()",
+    "DROP TRIGGER IF EXISTS shop_product_search_document ON shop_product",
+    "DROP FUNCTION IF EXISTS shop_product_search_document()",
+    f"ALTER TABLE shop_product DROP COLUMN IF EXISTS {POSTGRES_SEARCH_COLUMN}",
+]
+
+
+def _execute(db_connection, statements, params=None):
+    with db_connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql, params)
+
+
+def create_search_index(db_connection):
+    """Create the search index for the database vendor (and fill it)."""
+    if db_connection.vendor == 'sqlite':
+        _execute(db_connection, SQLITE_CREATE_SQL)
+        _execute(db_connection, [f"DELETE FROM {SQLITE_FTS_TABLE}", SQLITE_POPULATE_SQL])
+    elif db_connection.vendor == 'postgresql':
+        _execute(db_connection, POSTGRES_CREATE_SQL)
+        _execute(db_connection, [POSTGRES_POPULATE_SQL])
+
+
+def drop_search_index(db_connection):
+    """Drop the search index for the database vendor."""
+    if db_connection.vendor == 'sqlite':
+        _execute(db_connection, SQLITE_DROP_SQL)
+    elif db_connection.vendor == 'postgresql':
+        _execute(db_connection, POSTGRES_DROP_SQL)
+
+
+def parse_terms(query: str) -> list:
+    """Split a search string into lowercase words (punctuation dropped)."""
+    return re.findall(r'\w+', query.lower())
+
+
+class BasicSearchBackend:
+    """Fallback without a full-text index: icontains on name and description."""
+
+    def search(self, queryset, query: str):
+        """Filter ``queryset`` to products matching every word of ``query``."""
+        for term in parse_terms(query):
+            queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+        return queryset
+
+    def rebuild(self):
+        """Nothing to rebuild."""
+
+
+class SQLiteSearchBackend(BasicSearchBackend):
+    """FTS5 search ranked with bm25 (name weighs most, then category)."""
+
+    WEIGHTS = (10.0, 1.0, 3.0)
+
+    def search(self, queryset, query: str):
+        terms = parse_terms(query)
+        if not terms:
+            return queryset
+
+        # Joined on rowid, so the caller's filters narrow the matches in SQL
+        match = ' '.join(f'"{term}"*' for term in terms)
+        table = queryset.model._meta.db_table
+        return queryset.extra(
+            tables=[SQLITE_FTS_TABLE],
+            where=[f"{SQLITE_FTS_TABLE}.rowid = {table}.id", f"{SQLITE_FTS_TABLE} MATCH %s"],
+            params=[match],
+            select={'search_rank': f"bm25({SQLITE_FTS_TABLE}, %s, %s, %s)"},
+            select_params=self.WEIGHTS,
+        ).order_by('search_rank', '-pk')
+
+    def rebuild(self):
+        _execute(connection, SQLITE_DROP_SQL)
+        create_search_index(connection)
+        _execute(connection, [f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('optimize')"])
+
+
+class PostgresSearchBackend(BasicSearchBackend):
+    """tsvector search over the GIN-indexed document column, ranked with ts_rank."""
+
+    # ts_rank weights of {D, C, B, A}: description, category, name
+    WEIGHTS = '{0.1, 0.1, 0.3, 1.0}'
+
+    def search(self, queryset, query: str):
+        terms = parse_terms(query)
+        if not terms:
+            return queryset
+
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        document = f"{queryset.model._meta.db_table}.{POSTGRES_SEARCH_COLUMN}"
+        ts_query = f"to_tsquery('{POSTGRES_SEARCH_CONFIG}', %s)"
+        match = RawSQL(f"{document} @@ {ts_query}", [tsquery], output_field=BooleanField())
+        rank = RawSQL(
+            f"ts_rank('{self.WEIGHTS}', {document}, {ts_query})", [tsquery], output_field=FloatField()
+        )
+        return (
+            queryset.annotate(search_match=match, search_rank=rank)
+            .filter(search_match=True)
+            .order_by('-search_rank', '-pk')
+        )
+
+    def rebuild(self):
+        _execute(connection, [POSTGRES_POPULATE_SQL, f"REINDEX INDEX {POSTGRES_SEARCH_INDEX}"])
+
+
+_backend = None
+
+
+def get_search_backend():
+    """Pick the search backend of the default database (checked once per process)."""
+    global _backend
+    if _backend is None:
+        if connection.vendor == 'sqlite' and SQLITE_FTS_TABLE in connection.introspection.table_names():
+            _backend = SQLiteSearchBackend()
+        elif connection.vendor == 'postgresql':
+            _backend = PostgresSearchBackend()
+        else:
+            _backend = BasicSearchBackend()
+    return _backend
+
+
+def search_products(queryset, query: str):
+    """
+    Filter a Product queryset by a search string, ordered by relevance.
+    """
+    return get_search_backend().search(queryset, query)
@@ -0,0 +1,81 @@
+"""Signal receivers for shop app."""
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from .constants import STOCK_MOVEMENT_RESTOCK
+from .models import Category, Order, OrderItem, Product, StockMovement
+from .services.cart_badge import invalidate_cart_badge
+from .services.cart_service import CartService
+from .services.inventory_service import inventory_ledger
+from .services.catalog_cache import bump_catalog_version, bump_categories_version
+from .services.order_count_service import invalidate_user_order_count
+from .services.product_cache import product_cache
+
+
+@receiver(user_logged_in)
+def merge_cart_on_login(sender, request, user, **kwargs):
+    """Merge the anonymous cart into the user's cart."""
+    if request is not None and hasattr(request, 'session'):
+        CartService(request).merge_anonymous_cart(user)
+        invalidate_cart_badge(request)
+
+
+@receiver(user_logged_out)
+def reset_cart_badge_on_logout(sender, request, user, **kwargs):
+    """The logged-out session starts with an empty cart."""
+    if request is not None:
+        invalidate_cart_badge(request)
+
+
+@receiver(post_save, sender=Order)
+def refresh_order_count_on_create(sender, instance, created, **kwargs):
+    """A new order changes its user's order count."""
+    if created:
+        invalidate_user_order_count(instance.user_id)
+
+
+@receiver(post_delete, sender=Order)
+def refresh_order_count_on_delete(sender, instance, **kwargs):
+    """A deleted order changes its user's order count."""
+    invalidate_user_order_count(instance.user_id)
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def refresh_order_totals(sender, instance, **kwargs):
+    """Line changes refresh the stored order totals (also sent per line by queryset deletes)."""
+    Order.recalculate_totals([instance.order_id])
+
+
+@receiver(post_init, sender=Product)
+def remember_product_category(sender, instance, **kwargs):
+    """Keep the loaded category of a product, to invalidate it if the product moves."""
+    instance._loaded_category_id = instance.__dict__.get('category_id')
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_caches(sender, instance, **kwargs):
+    """Product changes invalidate the cached product, catalog pages and their category's fragments."""
+    bump_catalog_version([instance.category_id, instance._loaded_category_id])
+    product_cache.invalidate([instance.pk])
+
+
+@receiver(post_save, sender=Product)
+def record_opening_stock(sender, instance, created, **kwargs):
+    """The stock of a new product is its first ledger movement."""
+    if created and instance.stock:
+        inventory_ledger.record([
+            StockMovement(product=instance, kind=STOCK_MOVEMENT_RESTOCK,
+                          quantity=instance.stock, note='Opening stock')
+        ])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_caches(sender, instance, **kwargs):
+    """Category changes invalidate catalog pages, the category's fragments and the registry."""
+    bump_catalog_version([instance.pk])
+    bump_categories_version()
+    # Cached products carry their category
+    product_cache.invalidate(Product.objects.filter(category=instance).values_list('pk', flat=True))
@@ -0,0 +1,18 @@
+"""
+Template tags for product image derivatives.
+
+Usage:
+    {% load product_images %}
+    <img src="{% product_image_url product.image 'card' %}">
+    <source type="image/webp" srcset="{% product_image_url product.image 'card' 'WEBP' %}">
+"""
+from django import template
+from ..services.image_service import product_images
+
+register = template.Library()
+
+
+@register.simple_tag
+def product_image_url(image, size, image_format='JPEG'):
+    """URL of a resized product image (the original until it is built)."""
+    return product_images.url(image, size, image_format)
@@ -1,3 +1,832 @@
-from django.test import TestCase
+import base64
+import itertools
+import json
+import os
+import random
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.http import QueryDict
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from .constants import (
+    MAX_CART_OPERATIONS,
+    ORDER_STATUS_CANCELLED,
+    ORDER_STATUS_CONFIRMED,
+    ORDER_STATUS_PENDING,
+    ORDER_STATUS_SHIPPED,
+)
+from .models import (
+    Cart,
+    Category,
+    Customer,
+    Order,
+    OrderItem,
+    OrderStatusHistory,
+    Product,
+    StockReservation,
+)
+from .services.cart_badge import CART_BADGE_COOKIE
+from .services.cart_service import CartService
+from .services.cart_storage import cart_write_stats, get_cart_storage
+from .services.catalog_import_service import CatalogImporter, InvalidRow, read_rows
+from .services.inventory_service import inventory_ledger
+from .services.order_export_service import filter_orders
+from .services.pagination import PAGINATION_KEYSET, KeysetPaginator
+from .services.product_cache import product_cache
+from .services.recommendation_service import RecommendationService, count_co_purchases
+from .services.reservation_service import InsufficientStockError
+from .services.search_service import search_products
 
-# Create your tests here.
+
+class CoPurchaseCountTests(SimpleTestCase):
+    """Pair counting of the recommendation job."""
+
+    def _orders(self, orders=300, products=40, seed=7):
+        rng = random.Random(seed)
+        order_ids, product_ids = [], []
+        for order_id in range(1, orders + 1):
+            for product_id in sorted(rng.sample(range(1, products + 1), rng.randint(1, 8))):
+                order_ids.append(order_id)
+                product_ids.append(product_id)
+        return order_ids, product_ids
+
+    def _expected(self, order_ids, product_ids, max_products):
+        counts = Counter()
+        for _, group in itertools.groupby(zip(order_ids, product_ids), key=lambda row: row[0]):
+            products = [product_id for _, product_id in group]
+            if 1 < len(products) <= max_products:
+                counts.update(itertools.permutations(products, 2))
+        return dict(counts)
+
+    def test_counts_both_directions(self):
+        counts = count_co_purchases([1, 1, 1, 2, 2], [3, 5, 9, 3, 5])
+        self.assertEqual(counts, {
+            (3, 5): 2, (5, 3): 2,
+            (3, 9): 1, (9, 3): 1,
+            (5, 9): 1, (9, 5): 1,
+        })
+
+    def test_skips_large_orders(self):
+        self.assertEqual(count_co_purchases([1, 1, 1], [1, 2, 3], max_products=2), {})
+
+    def test_matches_pairwise_counting(self):
+        order_ids, product_ids = self._orders()
+        for max_products in (50, 5, 2):
+            with self.subTest(max_products=max_products):
+                self.assertEqual(
+                    count_co_purchases(order_ids, product_ids, max_products),
+                    self._expected(order_ids, product_ids, max_products)
+                )
+
+    def test_without_pairs(self):
+        self.assertEqual(count_co_purchases([1, 2], [4, 4]), {})
+
+
+class RecommendationRefreshTests(TestCase):
+    """Incremental refresh of the stored recommendations."""
+
+    def setUp(self):
+        category = Category.objects.create(name='Phones')
+        self.products = [
+            Product.objects.create(
+                name=f'Phone {number}', category=category, price=Decimal('10.00'), description='Phone', stock=5
+            )
+            for number in range(3)
+        ]
+        self.customer = Customer.objects.create(email='buyer@example.com', first_name='Ada', last_name='Lovelace')
+        self.service = RecommendationService(batch_size=2)
+
+    def _order(self, pk, *products):
+        order = Order.objects.create(pk=pk, customer=self.customer, order_number=f'TEST-{pk}')
+        for product in products:
+            OrderItem.objects.create(order=order, product=product, quantity=1, unit_price=product.price)
+        return order
+
+    def _scores(self, product):
+        return dict(product.recommendations.values_list('recommended_id', 'score'))
+
+    def test_order_committed_below_mined_ids_is_mined(self):
+        phone, case, charger = self.products
+        for pk in (10, 11, 12):
+            self._order(pk, phone, case)
+        self.assertEqual(self.service.refresh()['orders'], 3)
+
+        # Lower id committed after the higher ones were mined
+        self._order(5, phone, charger)
+        self.assertEqual(self.service.refresh()['orders'], 1)
+        self.assertEqual(self._scores(phone), {case.pk: 3, charger.pk: 1})
+
+        # Nothing left to mine: scores are not counted twice
+        self.assertEqual(self.service.refresh()['orders'], 0)
+        self.assertEqual(self._scores(phone), {case.pk: 3, charger.pk: 1})
+
+    def test_full_refresh_recounts_every_order(self):
+        phone, case, _ = self.products
+        self._order(1, phone, case)
+        self.service.refresh()
+
+        self.assertEqual(self.service.refresh(full=True)['orders'], 1)
+        self.assertEqual(self._scores(phone), {case.pk: 1})
+
+
+class CheckoutTests(TestCase):
+    """Checkout through the views."""
+
+    def setUp(self):
+        category = Category.objects.create(name='Phones')
+        self.product = Product.objects.create(
+            name='Phone', category=category, price=Decimal('10.00'), description='Phone', stock=2
+        )
+
+    def _cart_client(self, quantity=2):
+        client = Client()
+        client.post(reverse('shop:add-to-cart', args=[self.product.pk]), {'quantity': quantity})
+        return client
+
+    def _checkout(self, client, idempotency_key):
+        return client.post(reverse('shop:checkout'), {
+            'first_name': 'Ada', 'last_name': 'Lovelace', 'email': 'buyer@example.com',
+            'phone': '0600000000', 'address': '1 Main Street', 'postal_code': '75001',
+            'city': 'Paris', 'country': 'France', 'idempotency_key': idempotency_key,
+        })
+
+    def test_concurrent_carts_cannot_oversell(self):
+        first, second = self._cart_client(), self._cart_client()
+        self._checkout(first, 'first')
+        response = self._checkout(second, 'second')
+
+        self.assertRedirects(response, reverse('shop:cart'), fetch_redirect_response=False)
+        self.assertEqual(Order.objects.count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 0)
+
+    def test_resubmission_returns_the_first_order(self):
+        client = self._cart_client(quantity=1)
+        first = self._checkout(client, 'same-key')
+        second = self._checkout(client, 'same-key')
+
+        self.assertEqual(first['Location'], second['Location'])
+        self.assertEqual(Order.objects.count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 1)
+
+    def test_stock_held_by_another_cart_is_not_sold(self):
+        holder, other = self._cart_client(), self._cart_client(quantity=1)
+        holder.get(reverse('shop:checkout'))
+
+        response = self._checkout(other, 'other')
+        self.assertRedirects(response, reverse('shop:cart'), fetch_redirect_response=False)
+        self.assertEqual(Order.objects.count(), 0)
+
+        self._checkout(holder, 'holder')
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertFalse(StockReservation.objects.exists())
+
+
+
+class OrderCancellationTests(TestCase):
+    """Bulk cancellation restores the stock of the order lines."""
+
+    def setUp(self):
+        category = Category.objects.create(name='Phones')
+        self.products = [
+            Product.objects.create(
+                name=f'Phone {index}', category=category, price=Decimal('10.00'), description='Phone', stock=5
+            )
+            for index in range(2)
+        ]
+        customer = Customer.objects.create(email='buyer@example.com', first_name='Ada', last_name='Lovelace')
+        self.orders = []
+        for number in range(2):
+            order = Order.objects.create(customer=customer, order_number=f'TEST-{number}')
+            items = [{'product': product, 'quantity': 2} for product in self.products]
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=item['product'], quantity=2, unit_price=Decimal('10.00'))
+                for item in items
+            ])
+            Product.objects.filter(pk__in=[product.pk for product in self.products]).update(stock=F('stock') - 2)
+            self.orders.append(order)
+
+    def _stock(self):
+        return list(Product.objects.order_by('pk').values_list('stock', flat=True))
+
+    def test_cancel_restores_stock(self):
+        cancelled = Order.cancel_orders([order.pk for order in self.orders])
+
+        self.assertEqual(cancelled, 2)
+        self.assertEqual(
+            set(Order.objects.values_list('status', flat=True)), {ORDER_STATUS_CANCELLED}
+        )
+        self.assertEqual(self._stock(), [5, 5])
+
+    def test_cancelling_twice_restores_stock_once(self):
+        Order.cancel_orders([self.orders[0].pk])
+
+        self.assertEqual(Order.cancel_orders([self.orders[0].pk]), 0)
+        self.assertEqual(self._stock(), [3, 3])
+
+
+class SearchTests(TestCase):
+    """Full-text search combined with queryset filters."""
+
+    def setUp(self):
+        phones = Category.objects.create(name='Phones')
+        cases = Category.objects.create(name='Cases')
+        # Better matches than any result cap would keep, all filtered out
+        Product.objects.bulk_create([
+            Product(name=f'Phone {index}', slug=f'phone-{index}', category=phones,
+                    price=Decimal('10.00'), description='Phone phone phone', stock=1)
+            for index in range(600)
+        ])
+        self.case = Product.objects.create(
+            name='Leather case', category=cases, price=Decimal('5.00'), description='Fits any phone', stock=1
+        )
+        self.cases = cases
+
+    def test_filters_apply_before_ranking(self):
+        queryset = Product.objects.filter(category=self.cases)
+        self.assertEqual(list(search_products(queryset, 'phone')), [self.case])
+
+    def test_matches_category_name(self):
+        results = search_products(Product.objects.all(), 'cases')
+        self.assertEqual(list(results), [self.case])
+
+
+class CatalogImportTests(TestCase):
+    """Invalid rows are reported and skipped without stopping the import."""
+
+    def test_invalid_rows_are_skipped(self):
+        rows = [
+            {'name': 'Phone', 'category': 'Phones', 'price': '10.00', 'stock': '3'},
+            {'name': 'No price', 'category': 'Phones', 'price': 'NaN'},
+            {'name': 'Infinite', 'category': 'Phones', 'price': 'Infinity'},
+            {'name': 'Too much stock', 'category': 'Phones', 'price': '1', 'stock': '-1'},
+            {'name': '', 'category': 'Phones', 'price': '1'},
+            InvalidRow('invalid JSON: Expecting value'),
+            {'name': 'Case', 'category': 'Cases', 'price': '5'},
+        ]
+        stats = CatalogImporter().run(rows)
+
+        self.assertEqual((stats.rows, stats.imported, stats.skipped), (7, 2, 5))
+        self.assertEqual(sorted(Product.objects.values_list('name', flat=True)), ['Case', 'Phone'])
+
+    def test_malformed_json_lines_are_yielded_as_invalid_rows(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as source:
+            source.write('{"name": "Phone", "category": "Phones", "price": 10}\n{broken\n\n[1, 2]\n')
+        self.addCleanup(os.remove, source.name)
+
+        rows = list(read_rows(source.name))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['name'], 'Phone')
+        self.assertIsInstance(rows[1], InvalidRow)
+        self.assertIsInstance(rows[2], InvalidRow)
+
+        stats = CatalogImporter().run(rows)
+        self.assertEqual((stats.imported, stats.skipped), (1, 2))
+
+
+class InventoryLedgerTests(TestCase):
+    """Stock changes are recorded so the ledger always matches the stock."""
+
+    def setUp(self):
+        self.category = Category.objects.create(name='Phones')
+        self.product = Product.objects.create(
+            name='Phone', category=self.category, price=Decimal('10.00'), description='Phone', stock=5
+        )
+
+    def test_adjust_records_the_movement(self):
+        inventory_ledger.adjust(self.product.pk, 3)
+        inventory_ledger.adjust(self.product.pk, -6)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 2)
+        self.assertEqual(inventory_ledger.balances([self.product.pk]), {self.product.pk: 2})
+
+    def test_adjust_rejects_a_decrease_below_zero(self):
+        with self.assertRaises(InsufficientStockError):
+            inventory_ledger.adjust(self.product.pk, -6)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 5)
+        self.assertEqual(inventory_ledger.drift(), {})
+
+    def test_sale_and_cancellation_keep_the_ledger_balanced(self):
+        customer = Customer.objects.create(email='buyer@example.com', first_name='Ada', last_name='Lovelace')
+        order = Order.objects.create(customer=customer, order_number='TEST-1')
+        OrderItem.objects.create(order=order, product=self.product, quantity=2, unit_price=Decimal('10.00'))
+        Product.objects.filter(pk=self.product.pk).update(stock=F('stock') - 2)
+        inventory_ledger.record_sales(order, [{'product': self.product, 'quantity': 2}])
+        self.assertEqual(inventory_ledger.drift(), {})
+
+        Order.cancel_orders([order.pk])
+        self.assertEqual(inventory_ledger.drift(), {})
+        self.assertEqual(inventory_ledger.balances([self.product.pk]), {self.product.pk: 5})
+
+    def test_import_keeps_the_ledger_balanced(self):
+        rows = [
+            {'name': 'Phone', 'slug': self.product.slug, 'category': 'Phones', 'price': '10', 'stock': '8'},
+            {'name': 'Case', 'category': 'Cases', 'price': '5', 'stock': '4'},
+        ]
+        CatalogImporter().run(rows)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 8)
+        self.assertEqual(inventory_ledger.drift(), {})
+
+    def test_drift_compares_snapshot_and_movements_in_one_query(self):
+        inventory_ledger.adjust(self.product.pk, 3)
+        inventory_ledger.compact(timezone.now() + timedelta(seconds=1))
+        inventory_ledger.adjust(self.product.pk, -2)
+        case = Product.objects.create(
+            name='Case', category=self.category, price=Decimal('5.00'), description='Case', stock=0
+        )
+        # Changed outside the ledger
+        Product.objects.filter(pk=self.product.pk).update(stock=F('stock') + 1)
+        Product.objects.filter(pk=case.pk).update(stock=4)
+
+        with self.assertNumQueries(1):
+            drift = inventory_ledger.drift()
+        self.assertEqual(drift, {self.product.pk: (7, 6), case.pk: (4, 0)})
+        self.assertEqual(inventory_ledger.drift([case.pk]), {case.pk: (4, 0)})
+
+
+class CartStorageTestMixin:
+    """Cart behaviour every CART_STORAGE_BACKEND must provide."""
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Phones')
+        self.phone, self.case = (
+            Product.objects.create(name=name, category=category, price=Decimal('10.00'), description=name, stock=10)
+            for name in ('Phone', 'Case')
+        )
+        self.user = User.objects.create_user('ada', password='secret')
+
+    def _add(self, client, product, quantity):
+        client.post(reverse('shop:add-to-cart', args=[product.pk]), {'quantity': quantity})
+
+    def _request(self, client, user=None):
+        request = RequestFactory().get('/')
+        request.session = client.session
+        request.user = user or AnonymousUser()
+        return request
+
+    def _stored_cart(self, client, user=None):
+        cart = get_cart_storage(self._request(client, user)).load()
+        return {int(product_id): line['quantity'] for product_id, line in cart.items()}
+
+    def test_lines_are_saved_and_deleted(self):
+        client = Client()
+        self._add(client, self.phone, 2)
+        self._add(client, self.case, 1)
+        client.post(reverse('shop:update-cart', args=[self.case.pk]), {'quantity': 3})
+        self.assertEqual(self._stored_cart(client), {self.phone.pk: 2, self.case.pk: 3})
+
+        client.get(reverse('shop:remove-from-cart', args=[self.phone.pk]))
+        self.assertEqual(self._stored_cart(client), {self.case.pk: 3})
+
+    def test_clear(self):
+        client = Client()
+        self._add(client, self.phone, 2)
+        request = self._request(client)
+        CartService(request).clear_cart()
+        request.session.save()
+
+        self.assertEqual(self._stored_cart(client), {})
+
+    def test_login_merges_the_anonymous_cart(self):
+        returning = Client()
+        returning.force_login(self.user)
+        self._add(returning, self.phone, 2)
+
+        client = Client()
+        self._add(client, self.phone, 1)
+        self._add(client, self.case, 2)
+        client.login(username='ada', password='secret')
+
+        self.assertEqual(self._stored_cart(client, self.user), self.merged_cart())
+
+
+@override_settings(CART_STORAGE_BACKEND='shop.services.cart_storage.SessionCartStorage')
+class SessionCartStorageTests(CartStorageTestMixin, TestCase):
+
+    def merged_cart(self):
+        # The session (and its cart) survives login; there is nothing to merge
+        return {self.phone.pk: 1, self.case.pk: 2}
+
+
+@override_settings(CART_STORAGE_BACKEND='shop.services.cart_storage.DatabaseCartStorage')
+class DatabaseCartStorageTests(CartStorageTestMixin, TestCase):
+
+    def merged_cart(self):
+        return {self.phone.pk: 3, self.case.pk: 2}
+
+    def test_anonymous_cart_is_deleted_after_merge(self):
+        client = Client()
+        self._add(client, self.phone, 1)
+        client.force_login(self.user)
+
+        self.assertEqual(Cart.objects.filter(user__isnull=True).count(), 0)
+        self.assertEqual(self._stored_cart(client, self.user), {self.phone.pk: 1})
+
+
+@override_settings(CART_STORAGE_BACKEND='shop.services.cart_storage.CacheCartStorage')
+class CacheCartStorageTests(CartStorageTestMixin, TestCase):
+
+    def merged_cart(self):
+        return {self.phone.pk: 3, self.case.pk: 2}
+
+
+class OrderTotalsTests(TestCase):
+    """Stored order totals follow every change of the order lines."""
+
+    def setUp(self):
+        category = Category.objects.create(name='Phones')
+        product = Product.objects.create(
+            name='Phone', category=category, price=Decimal('2.00'), description='Phone', stock=10
+        )
+        customer = Customer.objects.create(email='buyer@example.com', first_name='Ada', last_name='Lovelace')
+        self.order = Order.objects.create(customer=customer, order_number='TEST-1')
+        self.lines = [
+            OrderItem.objects.create(order=self.order, product=product, quantity=quantity, unit_price=Decimal('2.00'))
+            for quantity in (3, 2)
+        ]
+
+    def _totals(self):
+        self.order.refresh_from_db()
+        return self.order.subtotal, self.order.total
+
+    def test_saving_a_line_updates_the_totals(self):
+        self.assertEqual(self._totals(), (Decimal('10.00'), Decimal('10.00')))
+
+        self.lines[0].quantity = 1
+        self.lines[0].save()
+        self.assertEqual(self._totals(), (Decimal('6.00'), Decimal('6.00')))
+
+    def test_admin_bulk_delete_updates_the_totals(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        client = Client()
+        client.force_login(admin)
+
+        response = client.post(reverse('admin:shop_orderitem_changelist'), {
+            'action': 'delete_selected',
+            '_selected_action': [self.lines[1].pk],
+            'post': 'yes',
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(OrderItem.objects.filter(pk=self.lines[1].pk).exists())
+        self.assertEqual(self._totals(), (Decimal('6.00'), Decimal('6.00')))
+
+
+class CartBatchApiTests(TestCase):
+    """Batch cart operations are applied all together or not at all."""
+
+    def setUp(self):
+        category = Category.objects.create(name='Phones')
+        self.phone, self.case = (
+            Product.objects.create(name=name, category=category, price=Decimal('10.00'), description=name, stock=5)
+            for name in ('Phone', 'Case')
+        )
+        self.client.post(reverse('shop:add-to-cart', args=[self.phone.pk]), {'quantity': 2})
+
+    def _batch(self, operations):
+        return self.client.post(
+            reverse('shop:cart-api-batch'), json.dumps({'operations': operations}), content_type='application/json'
+        )
+
+    def _cart(self):
+        return {item['product_id']: item['quantity'] for item in self._batch([]).json()['items']}
+
+    def test_operations_are_applied_together(self):
+        response = self._batch([
+            {'op': 'add', 'product_id': self.case.pk, 'quantity': 1},
+            {'op': 'update', 'product_id': self.phone.pk, 'quantity': 3},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['item_count'], 4)
+        self.assertEqual(self._cart(), {self.phone.pk: 3, self.case.pk: 1})
+
+    def test_failing_batch_changes_nothing(self):
+        response = self._batch([
+            {'op': 'add', 'product_id': self.case.pk, 'quantity': 1},
+            {'op': 'add', 'product_id': 0, 'quantity': 1},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'errors': [{'index': 1, 'error': 'Product not found'}]})
+        self.assertEqual(self._cart(), {self.phone.pk: 2})
+
+    def test_stock_is_checked_against_the_final_quantity(self):
+        # Each add fits on its own, their sum does not
+        response = self._batch([
+            {'op': 'add', 'product_id': self.phone.pk, 'quantity': 2},
+            {'op': 'add', 'product_id': self.phone.pk, 'quantity': 2},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], [{'index': 1, 'error': 'Only 5 units of Phone available'}])
+
+        # Going over the stock and back within the batch is fine
+        response = self._batch([
+            {'op': 'add', 'product_id': self.phone.pk, 'quantity': 10},
+            {'op': 'update', 'product_id': self.phone.pk, 'quantity': 5},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._cart(), {self.phone.pk: 5})
+
+    def test_update_to_zero_removes_the_line(self):
+        response = self._batch([{'op': 'update', 'product_id': self.phone.pk, 'quantity': 0}])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['items'], [])
+
+    def test_too_many_operations_are_rejected(self):
+        operations = [{'op': 'remove', 'product_id': self.case.pk}] * (MAX_CART_OPERATIONS + 1)
+        response = self._batch(operations)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0]['index'], None)
+        self.assertEqual(self._cart(), {self.phone.pk: 2})
+
+    def test_invalid_operations_are_reported_by_index(self):
+        response = self._batch([
+            {'op': 'remove', 'product_id': self.phone.pk},
+            {'op': 'explode', 'product_id': self.phone.pk},
+            {'op': 'add', 'product_id': self.case.pk, 'quantity': 0},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual([error['index'] for error in errors], [1, 2])
+        self.assertTrue(all(error['error'] for error in errors))
+        self.assertEqual(self._cart(), {self.phone.pk: 2})
+
+
+class OrderTransitionTests(TestCase):
+    """Bulk status transitions follow ORDER_STATUS_TRANSITIONS and log each change."""
+
+    def setUp(self):
+        category = Category.objects.create(name='Phones')
+        self.product = Product.objects.create(
+            name='Phone', category=category, price=Decimal('10.00'), description='Phone', stock=5
+        )
+        customer = Customer.objects.create(email='buyer@example.com', first_name='Ada', last_name='Lovelace')
+        self.orders = {}
+        for status in (ORDER_STATUS_PENDING, ORDER_STATUS_CONFIRMED, ORDER_STATUS_SHIPPED):
+            order = Order.objects.create(customer=customer, order_number=f'TEST-{status}', status=status)
+            OrderItem.objects.create(order=order, product=self.product, quantity=1, unit_price=Decimal('10.00'))
+            self.orders[status] = order
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+
+    def _ids(self):
+        return [order.pk for order in self.orders.values()]
+
+    def test_disallowed_transitions_are_skipped(self):
+        moved = Order.transition_orders(self._ids(), ORDER_STATUS_SHIPPED)
+
+        self.assertEqual(moved, 1)
+        self.assertEqual(
+            dict(Order.objects.values_list('order_number', 'status')),
+            {
+                f'TEST-{ORDER_STATUS_PENDING}': ORDER_STATUS_PENDING,
+                f'TEST-{ORDER_STATUS_CONFIRMED}': ORDER_STATUS_SHIPPED,
+                f'TEST-{ORDER_STATUS_SHIPPED}': ORDER_STATUS_SHIPPED,
+            }
+        )
+
+    def test_one_history_row_per_changed_order(self):
+        Order.transition_orders(self._ids(), ORDER_STATUS_CANCELLED, changed_by=self.admin)
+
+        self.assertEqual(
+            sorted(OrderStatusHistory.objects.values_list(
+                'order__order_number', 'from_status', 'to_status', 'changed_by'
+            )),
+            [
+                (f'TEST-{ORDER_STATUS_CONFIRMED}', ORDER_STATUS_CONFIRMED, ORDER_STATUS_CANCELLED, self.admin.pk),
+                (f'TEST-{ORDER_STATUS_PENDING}', ORDER_STATUS_PENDING, ORDER_STATUS_CANCELLED, self.admin.pk),
+            ]
+        )
+
+    def test_cancelling_restores_stock_once(self):
+        self.assertEqual(Order.transition_orders(self._ids(), ORDER_STATUS_CANCELLED), 2)
+        self.assertEqual(Order.transition_orders(self._ids(), ORDER_STATUS_CANCELLED), 0)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 7)
+        self.assertEqual(OrderStatusHistory.objects.count(), 2)
+
+    def test_admin_action_reports_moved_and_skipped_orders(self):
+        client = Client()
+        client.force_login(self.admin)
+        response = client.post(reverse('admin:shop_order_changelist'), {
+            'action': f'mark_{ORDER_STATUS_CANCELLED}',
+            '_selected_action': self._ids(),
+        }, follow=True)
+
+        messages = [str(message) for message in response.context['messages']]
+        self.assertEqual(messages, [
+            f'2 order(s) marked as {ORDER_STATUS_CANCELLED}.',
+            f'1 order(s) skipped: not allowed to become {ORDER_STATUS_CANCELLED}.',
+        ])
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages walk the whole ordering in both directions."""
+
+    def setUp(self):
+        category = Category.objects.create(name='Phones')
+        now = timezone.now()
+        for index in range(11):
+            product = Product.objects.create(
+                name=f'Phone {index}', category=category, price=Decimal('10.00'), description='Phone', stock=1
+            )
+            # Pairs of products share a timestamp: the id breaks ties
+            Product.objects.filter(pk=product.pk).update(created_at=now - timedelta(hours=index // 2))
+        self.paginator = KeysetPaginator(Product.objects.all(), 3, ('-created_at', '-pk'))
+        self.expected = list(Product.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+
+    def _page(self, query=''):
+        return self.paginator.get_page(QueryDict(query.lstrip('?')))
+
+    def test_next_and_previous_cursors_round_trip(self):
+        pages = [self._page()]
+        while pages[-1].has_next:
+            pages.append(self._page(pages[-1].next_query))
+        self.assertEqual([product.pk for page in pages for product in page], self.expected)
+        self.assertFalse(pages[0].has_previous)
+
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = self._page(page.previous_query)
+            self.assertEqual([product.pk for product in page], [product.pk for product in expected])
+        self.assertFalse(page.has_previous)
+
+    def test_invalid_cursor_gives_the_first_page(self):
+        first = [product.pk for product in self._page()]
+        tampered = base64.urlsafe_b64encode(json.dumps(['not a date', 'x']).encode()).decode()
+        for cursor in ('garbage', tampered, base64.urlsafe_b64encode(b'[1]').decode()):
+            with self.subTest(cursor=cursor):
+                self.assertEqual([product.pk for product in self._page(f'after={cursor}')], first)
+
+    def test_other_parameters_are_kept_in_page_links(self):
+        page = self._page('category=phones&page=4')
+        self.assertTrue(page.next_query.startswith('?category=phones&after='))
+        self.assertEqual(page.first_query, '?category=phones')
+
+    @override_settings(PRODUCT_LIST_PAGINATION=PAGINATION_KEYSET)
+    def test_product_list_uses_numbered_pages_for_search(self):
+        cache.clear()
+        response = self.client.get(reverse('shop:product-list'))
+        self.assertTrue(response.context['page_obj'].is_keyset)
+
+        # Relevance order has no keyset: numbered pages counted from the facets
+        response = self.client.get(reverse('shop:product-list'), {'search': 'phone'})
+        page = response.context['page_obj']
+        self.assertFalse(getattr(page, 'is_keyset', False))
+        self.assertEqual((page.number, page.paginator.count), (1, 11))
+
+
+class OrderExportFilterTests(TestCase):
+    """Date filters of the order export cover whole days."""
+
+    def test_date_range_includes_whole_days(self):
+        customer = Customer.objects.create(email='buyer@example.com', first_name='Ada', last_name='Lovelace')
+        day = timezone.make_aware(datetime(2026, 3, 10))
+        for number, created_at in enumerate((
+            day - timedelta(microseconds=1), day, day + timedelta(days=1, seconds=-1), day + timedelta(days=1)
+        )):
+            order = Order.objects.create(customer=customer, order_number=f'TEST-{number}')
+            Order.objects.filter(pk=order.pk).update(created_at=created_at)
+
+        orders = filter_orders('2026-03-10', '2026-03-10')
+        self.assertEqual(sorted(orders.values_list('order_number', flat=True)), ['TEST-1', 'TEST-2'])
+        self.assertNotIn('cast_date', str(orders.query))
+
+
+class CartWriteTests(TestCase):
+    """Reading the cart never writes the session or the cart storage."""
+
+    def setUp(self):
+        category = Category.objects.create(name='Phones')
+        self.phone = Product.objects.create(
+            name='Phone', category=category, price=Decimal('10.00'), description='Phone', stock=5
+        )
+
+    def _writes(self, queries):
+        return [
+            query['sql'] for query in queries
+            if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+            and ('django_session' in query['sql'] or 'shop_cart' in query['sql'])
+        ]
+
+    def _read_cart_page(self):
+        self.client.post(reverse('shop:add-to-cart', args=[self.phone.pk]), {'quantity': 1})
+        writes, avoided = cart_write_stats.writes, cart_write_stats.writes_avoided
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('shop:cart'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._writes(queries), [])
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertEqual(cart_write_stats.writes, writes)
+        self.assertGreater(cart_write_stats.writes_avoided, avoided)
+
+    @override_settings(CART_STORAGE_BACKEND='shop.services.cart_storage.SessionCartStorage')
+    def test_session_cart_page_does_not_write(self):
+        self._read_cart_page()
+
+    @override_settings(CART_STORAGE_BACKEND='shop.services.cart_storage.DatabaseCartStorage')
+    def test_database_cart_page_does_not_write(self):
+        self._read_cart_page()
+
+    def test_stats_endpoint_is_staff_only(self):
+        url = reverse('shop:cart-api-stats')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(User.objects.create_user('staff', password='secret', is_staff=True))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {'writes', 'writes_avoided', 'pid'})
+
+
+class CartBadgeTests(TestCase):
+    """The cart count endpoint answers from the badge cookie."""
+
+    def setUp(self):
+        category = Category.objects.create(name='Phones')
+        self.phone = Product.objects.create(
+            name='Phone', category=category, price=Decimal('10.00'), description='Phone', stock=5
+        )
+
+    def _add(self, quantity=1):
+        self.client.post(reverse('shop:add-to-cart', args=[self.phone.pk]), {'quantity': quantity})
+
+    def test_matching_etag_gets_304(self):
+        self._add()
+        response = self.client.get(reverse('shop:cart-api-count'))
+        self.assertEqual(response.json(), {'count': 1})
+
+        response = self.client.get(reverse('shop:cart-api-count'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_mutation_changes_cookie_and_etag(self):
+        self._add()
+        cookie = self.client.cookies[CART_BADGE_COOKIE].value
+        etag = self.client.get(reverse('shop:cart-api-count'))['ETag']
+
+        self._add()
+        self.assertNotEqual(self.client.cookies[CART_BADGE_COOKIE].value, cookie)
+        response = self.client.get(reverse('shop:cart-api-count'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'count': 2})
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class ProductCacheTests(TestCase):
+    """Product changes drop exactly the cached products they touch."""
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Phones')
+        self.phone, self.case = (
+            Product.objects.create(
+                name=name, category=self.category, price=Decimal('10.00'), description=name, stock=5
+            )
+            for name in ('Phone', 'Case')
+        )
+        product_cache.get_many([self.phone.pk, self.case.pk])
+
+    def test_save_drops_only_the_saved_product(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.phone.price = Decimal('12.00')
+            self.phone.save()
+
+        self.assertIsNone(cache.get(f'product:{self.phone.pk}'))
+        self.assertIsNotNone(cache.get(f'product:{self.case.pk}'))
+        self.assertEqual(product_cache.get(self.phone.pk).price, Decimal('12.00'))
+
+    def test_bulk_update_drops_the_written_products(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=self.case.pk).update(price=Decimal('3.00'))
+
+        self.assertIsNotNone(cache.get(f'product:{self.phone.pk}'))
+        self.assertEqual(product_cache.get(self.case.pk).price, Decimal('3.00'))
+
+    def test_category_change_drops_its_products(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = 'Smartphones'
+            self.category.save()
+
+        self.assertEqual(product_cache.get(self.phone.pk).category.name, 'Smartphones')
+        self.assertEqual(product_cache.get(self.case.pk).category.name, 'Smartphones')
@@ -1,7 +1,7 @@
 """Shop app URL configuration."""
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from .views.cart.views import CartView, add_to_cart, remove_from_cart, update_cart, cart_count_api 
+from .views.cart.views import CartView, add_to_cart, remove_from_cart, update_cart, cart_count_api, cart_batch_api, cart_write_stats_api
 from .views import (
     ProductListView,
     ProductDetailView,
@@ -10,6 +10,8 @@ from .views import (
     remove_from_cart,
     update_cart,
     cart_count_api,
+    cart_batch_api,
+    cart_write_stats_api,
     CheckoutView,
     OrderConfirmationView,
     RegisterView,
@@ -37,6 +39,8 @@ urlpatterns = [
     path('cart/remove/<int:product_id>/', remove_from_cart, name='remove-from-cart'),
     path('cart/update/<int:product_id>/', update_cart, name='update-cart'),
     path('api/cart/count/', cart_count_api, name='cart-api-count'),
+    path('api/cart/batch/', cart_batch_api, name='cart-api-batch'),
+    path('api/cart/stats/', cart_write_stats_api, name='cart-api-stats'),
     
     # Checkout & Orders
     path('checkout/', CheckoutView.as_view(), name='checkout'),
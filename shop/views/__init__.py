@@ -1,6 +1,6 @@
 """Shop views package."""
 from .products.views import ProductListView, ProductDetailView
-from .cart.views import CartView, add_to_cart, remove_from_cart, update_cart, cart_count_api
+from .cart.views import CartView, add_to_cart, remove_from_cart, update_cart, cart_count_api, cart_batch_api, cart_write_stats_api
 from .checkout.views import CheckoutView, OrderConfirmationView
 from .auth.views import RegisterView, LoginView, logout_view
 from .orders.views import UserOrdersListView, OrderDetailView
@@ -13,6 +13,8 @@ __all__ = [
     'remove_from_cart',
     'update_cart',
     'cart_count_api',
+    'cart_batch_api',
+    'cart_write_stats_api',
     'CheckoutView',
     'OrderConfirmationView',
     'RegisterView',
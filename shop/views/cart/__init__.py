@@ -1,5 +1,5 @@
 """Cart views."""
-from .views import CartView, add_to_cart, remove_from_cart, update_cart, cart_count_api
+from .views import CartView, add_to_cart, remove_from_cart, update_cart, cart_count_api, cart_batch_api, cart_write_stats_api
 
 
-__all__ = ['CartView', 'add_to_cart', 'remove_from_cart', 'update_cart', 'cart_count_api']
+__all__ = ['CartView', 'add_to_cart', 'remove_from_cart', 'update_cart', 'cart_count_api', 'cart_batch_api', 'cart_write_stats_api']
@@ -1,10 +1,17 @@
 """Shopping cart views."""
-from django.shortcuts import redirect, get_object_or_404
+import json
+import os
+from django.shortcuts import redirect
 from django.contrib import messages
 from django.views.generic import TemplateView
-from ...models import Product
-from ...services.cart_service import CartService
-from django.http import JsonResponse
+from ...services.cart_service import CartService, CartOperationError
+from ...services.cart_badge import read_cart_badge, get_cart_count
+from ...services.cart_storage import cart_write_stats
+from ...services.product_cache import product_cache
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET, require_POST
 
 
 class CartView(TemplateView):
@@ -14,11 +21,11 @@ class CartView(TemplateView):
     def get_context_data(self, **kwargs):
         """Add cart data to context."""
         context = super().get_context_data(**kwargs)
-        cart_service = CartService(self.request)
+        snapshot = CartService(self.request).get_snapshot()
         
-        context['cart_items'] = cart_service.get_cart_items()
-        context['cart_total'] = cart_service.get_total()
-        context['item_count'] = cart_service.get_item_count()
+        context['cart_items'] = snapshot.items
+        context['cart_total'] = snapshot.total
+        context['item_count'] = snapshot.item_count
         
         return context
 
@@ -26,7 +33,9 @@ class CartView(TemplateView):
 def add_to_cart(request, product_id):
     """Add product to cart via POST request."""
     if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
+        product = product_cache.get(product_id, request)
+        if product is None:
+            raise Http404("Product not found")
         quantity = int(request.POST.get('quantity', 1))
         cart_service = CartService(request)
         
@@ -63,9 +72,61 @@ def update_cart(request, product_id):
     
     return redirect('shop:cart')
 
+
+def _cart_count_etag(request):
+    """ETag from the badge cookie (None makes the view compute the count)."""
+    badge = read_cart_badge(request)
+    return badge.etag if badge is not None else None
+
+
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_cart_count_etag)
 def cart_count_api(request):
-    """Return cart item count as JSON."""
-    cart_service = CartService(request)
+    """
+    Return cart item count as JSON.
+
+    Answered from the badge cookie, with 304 when the client's ETag
+    matches; the cart storage is only loaded when the cookie is missing.
+    """
     return JsonResponse({
-        'count': cart_service.get_item_count()
+        'count': get_cart_count(request)
     })
+
+
+@require_POST
+def cart_batch_api(request):
+    """
+    Apply a batch of cart operations and return the new cart as JSON.
+
+    Body: ``{"operations": [{"op": "add" | "update" | "remove",
+    "product_id": 1, "quantity": 2}, ...]}``. All operations are
+    applied or none is (400 with the list of errors).
+    """
+    try:
+        operations = json.loads(request.body)['operations']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'errors': [{'index': None, 'error': 'Invalid JSON body'}]}, status=400)
+
+    if not isinstance(operations, list):
+        return JsonResponse({'errors': [{'index': None, 'error': 'operations must be a list'}]}, status=400)
+
+    try:
+        snapshot = CartService(request).apply_operations(operations)
+    except CartOperationError as e:
+        return JsonResponse({'errors': e.errors}, status=400)
+
+    return JsonResponse(snapshot.as_dict())
+
+
+@require_GET
+@staff_member_required
+@cache_control(private=True, no_store=True)
+def cart_write_stats_api(request):
+    """
+    Return the cart write counters of the answering worker process (staff only).
+
+    ``writes`` counts flushes that persisted a cart, ``writes_avoided``
+    the reads and coalesced mutations that did not write.
+    """
+    return JsonResponse({**cart_write_stats.as_dict(), 'pid': os.getpid()})
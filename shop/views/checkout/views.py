@@ -2,8 +2,9 @@
 from django.shortcuts import render, redirect
 from django.views.generic import FormView, TemplateView
 from django.contrib import messages
-from shop.models import Order, OrderItem, Customer
+from shop.models import Order
 from shop.services.cart_service import CartService
+from shop.services.checkout_service import CheckoutService, InsufficientStockError
 from shop.forms import CheckoutForm
 
 
@@ -12,58 +13,61 @@ class CheckoutView(FormView):
     template_name = 'checkout/checkout.html'
     form_class = CheckoutForm
     success_url = '/'
+
+    def get(self, request, *args, **kwargs):
+        """Hold cart stock while the checkout form is filled in."""
+        if CartService(request).get_cart_items():
+            try:
+                CheckoutService(request).reserve_cart()
+            except InsufficientStockError as e:
+                messages.error(request, f'Sorry, {e.product.name} is no longer available in the requested quantity.')
+                return redirect('shop:cart')
+        return super().get(request, *args, **kwargs)
+
+    def get_initial(self):
+        """Give every rendered form a fresh submission token."""
+        initial = super().get_initial()
+        initial['idempotency_key'] = CheckoutService.new_idempotency_key()
+        return initial
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        cart_service = CartService(self.request)
+        snapshot = CartService(self.request).get_snapshot()
         
-        context['cart_items'] = cart_service.get_cart_items()
-        context['cart_total'] = cart_service.get_total()
+        context['cart_items'] = snapshot.items
+        context['cart_total'] = snapshot.total
         
         return context
     
     def form_valid(self, form):
         """Process checkout and create order."""
-        cart_service = CartService(self.request)
-        cart_items = cart_service.get_cart_items()
-        
-        if not cart_items:
+        # A retried submission goes straight to the order it created
+        idempotency_key = form.cleaned_data.get('idempotency_key')
+        order = CheckoutService.find_submitted_order(idempotency_key)
+        if order is not None:
+            return redirect('shop:order-confirmation', order_number=order.order_number)
+
+        if not CartService(self.request).get_cart_items():
             messages.error(self.request, 'Your cart is empty!')
             return redirect('shop:cart')
         
-        # Create customer
-        customer, created = Customer.objects.get_or_create(
-            email=form.cleaned_data['email'],
-            defaults={
-                'first_name': form.cleaned_data['first_name'],
-                'last_name': form.cleaned_data['last_name'],
-                'phone': form.cleaned_data['phone'],
-                'address': form.cleaned_data['address'],
-                'postal_code': form.cleaned_data['postal_code'],
-                'city': form.cleaned_data['city'],
-                'country': form.cleaned_data['country'],
-            }
-        )
-        
-        # Create order
-        order = Order.objects.create(
-            customer=customer,
-            user=self.request.user if self.request.user.is_authenticated else None,
-            order_number=f"ORD-{Order.objects.count() + 1:06d}",
-            notes=form.cleaned_data.get('notes', '')
-        )
-        
-        # Create order items
-        for item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=item['product'],
-                quantity=item['quantity'],
-                unit_price=item['price']
+        customer_data = {
+            field: form.cleaned_data[field]
+            for field in (
+                'email', 'first_name', 'last_name', 'phone',
+                'address', 'postal_code', 'city', 'country',
             )
+        }
         
-        # Clear cart
-        cart_service.clear_cart()
+        try:
+            order = CheckoutService(self.request).place_order(
+                customer_data,
+                notes=form.cleaned_data.get('notes', ''),
+                idempotency_key=idempotency_key
+            )
+        except InsufficientStockError as e:
+            messages.error(self.request, f'Sorry, {e.product.name} is no longer available in the requested quantity.')
+            return redirect('shop:cart')
         
         messages.success(self.request, 'Order created successfully!')
         return redirect('shop:order-confirmation', order_number=order.order_number)
@@ -77,9 +81,9 @@ class OrderConfirmationView(TemplateView):
         context = super().get_context_data(**kwargs)
         
         try:
-            order = Order.objects.get(order_number=kwargs['order_number'])
+            order = Order.objects.with_lines().get(order_number=kwargs['order_number'])
             context['order'] = order
-            context['items'] = order.items.select_related('product').all()
+            context['items'] = order.items.all()
         except Order.DoesNotExist:
             context['error'] = 'Order not found'
         
@@ -0,0 +1,71 @@
+"""Reusable view mixins."""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from ..constants import CATALOG_PAGE_CACHE_TIMEOUT
+from ..services.catalog_cache import get_catalog_version, get_images_version, get_page_cache_key
+from ..services.pagination import KeysetPaginator
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin replacing OFFSET/COUNT pagination with keyset pages.
+
+    ``keyset_keys`` must match the queryset's index and end with a
+    unique key. Templates get ``page_obj`` (a KeysetPage) and
+    ``is_paginated`` as usual, but no page numbers or total count.
+    """
+
+    keyset_keys = ('-created_at', '-pk')
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_keys)
+        page = paginator.get_page(self.request.GET)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AnonymousPageCacheMixin:
+    """
+    Cache whole rendered pages for anonymous visitors without a session.
+
+    Keys embed ``get_page_cache_version()`` (the catalog and images
+    versions by default), so catalog changes drop every cached page at
+    once.
+    Visitors with a session (cart, messages) are always rendered, and
+    pages that issued a CSRF token are never stored: the token belongs
+    to the visitor who rendered them.
+    """
+
+    page_cache_timeout = CATALOG_PAGE_CACHE_TIMEOUT
+
+    def get_page_cache_version(self):
+        return f"{get_catalog_version()}.{get_images_version()}"
+
+    def is_page_cacheable(self, request) -> bool:
+        return (
+            request.method in ('GET', 'HEAD')
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and getattr(settings, 'MESSAGE_COOKIE_NAME', 'messages') not in request.COOKIES
+            and not request.user.is_authenticated
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.is_page_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = get_page_cache_key(request, self.get_page_cache_version())
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, 'add_post_render_callback'):
+            response.add_post_render_callback(
+                lambda rendered: self._store_page(request, key, rendered)
+            )
+        return response
+
+    def _store_page(self, request, key, response):
+        if not request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+            cache.set(key, (response.content, response['Content-Type']), self.page_cache_timeout)
@@ -4,25 +4,30 @@ User orders views - Enterprise modular structure
 from django.views.generic import ListView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import get_object_or_404
+from shop.constants import USER_ORDERS_PER_PAGE
 from shop.models import Order
+from shop.services.order_count_service import get_user_order_count
+from shop.views.mixins import KeysetPaginationMixin
 
-class UserOrdersListView(LoginRequiredMixin, ListView):
+class UserOrdersListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
     Display logged-in user orders with optimized queries.
+
+    Keyset-paginated on (created_at, id) along the (user, -created_at)
+    index; lines are prefetched for the visible page only.
     """
     template_name = 'orders/user_orders_list.html'
     context_object_name = 'orders'
+    paginate_by = USER_ORDERS_PER_PAGE
     
     def get_queryset(self):
         return Order.objects.filter(
             user=self.request.user
-        ).select_related('customer').prefetch_related(
-            'items__product'
-        ).order_by('-created_at')
+        ).with_lines().order_by('-created_at')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_orders'] = self.get_queryset().count()
+        context['total_orders'] = get_user_order_count(self.request.user)
         return context
 
 class OrderDetailView(LoginRequiredMixin, DetailView):
@@ -34,8 +39,8 @@ class OrderDetailView(LoginRequiredMixin, DetailView):
     def get_object(self, queryset=None):
         order_number = self.kwargs['order_number']
         return get_object_or_404(
-            Order, 
-            order_number=order_number, 
+            Order.objects.with_lines(),
+            order_number=order_number,
             user=self.request.user
         )
     
@@ -1,40 +1,79 @@
 """Product views: listing and detail."""
+from django.conf import settings
+from django.http import Http404
 from django.views.generic import ListView, DetailView
-from django.db.models import Q
-from ...models import Product, Category
+from django.views.generic.list import MultipleObjectMixin
+from ...models import Product
+from ...services.catalog_cache import get_category_version, get_recommendations_version
+from ...services.category_registry import category_registry
+from ...services.facet_service import ProductFilters, get_facets
+from ...services.pagination import (
+    KnownCountPaginator, PAGINATION_KEYSET, PAGINATION_OFFSET
+)
+from ...services.product_cache import product_cache
+from ...services.recommendation_service import recommendations
+from ...services.search_service import search_products
+from ..mixins import AnonymousPageCacheMixin, KeysetPaginationMixin
 
 
-class ProductListView(ListView):
-    """Display all available products with filtering and search."""
+class ProductListView(AnonymousPageCacheMixin, KeysetPaginationMixin, ListView):
+    """
+    Display all available products with faceted filtering and search.
+
+    Pagination follows the PRODUCT_LIST_PAGINATION setting: "keyset"
+    (cursor links on created_at/id; search results, ordered by
+    relevance, use numbered pages), "estimated" (numbered pages counted
+    from the cached facet total) or "offset" (Django's COUNT/OFFSET).
+    Anonymous visitors without a session get cached pages.
+    """
     model = Product
     template_name = 'products/product_list.html'
     context_object_name = 'products'
     paginate_by = 12
+    keyset_keys = ('-created_at', '-pk')
     
     def get_queryset(self):
-        """Filter products by category and search query."""
+        """Filter products by search query and facets (category, price, stock)."""
+        self.categories = category_registry.all()
+        self.filters = ProductFilters.from_params(self.request.GET)
         queryset = Product.objects.filter(is_available=True).select_related('category')
         
-        # Filter by category
-        category_slug = self.request.GET.get('category')
-        if category_slug:
-            queryset = queryset.filter(category__slug=category_slug)
-        
-        # Search by name or description
-        search_query = self.request.GET.get('search')
-        if search_query:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) | 
-                Q(description__icontains=search_query)
-            )
+        # Full-text search, ordered by relevance
+        if self.filters.search:
+            queryset = search_products(queryset, self.filters.search)
+        else:
+            queryset = queryset.order_by(*self.keyset_keys)
         
-        return queryset.order_by('-created_at')
+        # Facet counts are computed before the facet filters
+        self.facets = get_facets(queryset, self.filters, self.categories, self.request.GET)
+        return self.filters.apply(queryset)
+    
+    @property
+    def pagination_mode(self) -> str:
+        return getattr(settings, 'PRODUCT_LIST_PAGINATION', PAGINATION_OFFSET)
+    
+    def paginate_queryset(self, queryset, page_size):
+        """Keyset pages when enabled and not ordered by search relevance."""
+        if self.pagination_mode == PAGINATION_KEYSET and not self.filters.search:
+            return super().paginate_queryset(queryset, page_size)
+        return MultipleObjectMixin.paginate_queryset(self, queryset, page_size)
+    
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """Numbered pages reuse the facet total instead of COUNT(*)."""
+        if self.pagination_mode == PAGINATION_OFFSET:
+            return super().get_paginator(queryset, per_page, **kwargs)
+        return KnownCountPaginator(queryset, per_page, count=self.facets['total'], **kwargs)
     
     def get_context_data(self, **kwargs):
-        """Add categories and search query to context."""
+        """Add facets and search query to context (categories come from the context processor)."""
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.filter(is_active=True)
-        context['search_query'] = self.request.GET.get('search', '')
+        context['facets'] = self.facets
+        context['search_query'] = self.filters.search
+
+        # Page links keep the current filters
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        context['filter_query'] = params.urlencode()
         return context
 
 
@@ -45,20 +84,23 @@ class ProductDetailView(DetailView):
     context_object_name = 'product'
     slug_field = 'slug'
     
-    def get_queryset(self):
-        """Filter only available products."""
-        return Product.objects.filter(is_available=True).select_related('category')
+    def get_object(self, queryset=None):
+        """Get the available product by slug through the product cache."""
+        product = product_cache.get_by_slug(self.kwargs['slug'], self.request)
+        if product is None or not product.is_available:
+            raise Http404("Product not found")
+        return product
     
     def get_context_data(self, **kwargs):
         """Add related products to context."""
         context = super().get_context_data(**kwargs)
-        product = self.get_object()
+        product = self.object
+        
+        # Co-purchased products, completed from the same category
+        context['related_products'] = recommendations.lazy_for_product(product)
         
-        # Get related products from same category (max 4, exclude current)
-        context['related_products'] = (
-            product.category.products.filter(is_available=True)
-            .exclude(id=product.id)
-            .select_related('category')[:4]
-        )
+        # Keys of the cached fragments (related products are only queried on a miss)
+        context['category_version'] = get_category_version(product.category_id)
+        context['recommendations_version'] = get_recommendations_version()
         
         return context